@@ -0,0 +1,24 @@
+"""Panel and vortex methods for two-dimensional potential flows.
+
+Importing the package only loads numpy: scipy is imported by the solver
+functions that need it, numba by the kernels when that backend is used,
+and matplotlib only by aeropython.plotting, which is loaded on first use.
+"""
+import importlib
+
+from .kernels import get_backend, set_backend
+from .panels import Panel, PanelSet, as_panel_set
+from .particles import Particule, ParticleSystem, WakeSolver
+from .singularities import doublet, freeStream, sourceSink, superpose, vortex
+from .solver import (PanelSolver, get_velocity_field, polar,
+                     pressure_coefficients, read_profile)
+
+# submodules loaded on first access (PEP 562)
+_LAZY = ('plotting',)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__,
+                                                                     name))
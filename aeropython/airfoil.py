@@ -0,0 +1,98 @@
+import hashlib
+import os
+
+import numpy as np
+
+
+# directory of the parsed-geometry cache, disabled when None
+CACHE_DIR = os.environ.get('AEROPYTHON_CACHE_DIR')
+
+
+def parse_selig(text):
+    """Parses the coordinates of a Selig-style airfoil file.
+
+    Arguments
+    ---------
+    text -- content of the file; an optional title line is skipped.
+
+    Returns
+    -------
+    x, y -- Numpy 1d arrays (float) of the coordinates, in file order.
+    """
+    if isinstance(text, bytes):
+        text = text.decode('ascii', 'replace')
+    first, _, rest = text.partition('\n')
+    try:
+        [float(token) for token in first.split()]
+    except ValueError:
+        # title line
+        text = rest
+    values = np.fromstring(text, sep=' ')
+    if values.size % 2:
+        raise ValueError('odd number of coordinates in airfoil file')
+    points = values.reshape(-1, 2)
+    return points[:, 0], points[:, 1]
+
+
+def close_trailing_edge(x, y):
+    """Replaces the first and last points by their middle, so that the
+    contour starts and ends at the same trailing-edge point."""
+    x_te, y_te = 0.5*(x[0]+x[-1]), 0.5*(y[0]+y[-1])
+    x_ends = np.concatenate(([x_te], x[1:-1], [x_te]))
+    y_ends = np.concatenate(([y_te], y[1:-1], [y_te]))
+    return x_ends, y_ends
+
+
+def rotate(x, y, alp):
+    """Rotates the contour by alp (radians), clockwise."""
+    cos_a, sin_a = np.cos(alp), np.sin(alp)
+    return x*cos_a + y*sin_a, -x*sin_a + y*cos_a
+
+
+def cache_path(name, cache_dir=None):
+    """Returns the cache file of an airfoil, keyed by a hash of its content,
+    parsing the airfoil into it if needed.
+
+    Arguments
+    ---------
+    name -- path of the airfoil file.
+    cache_dir -- cache directory, CACHE_DIR by default.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if cache_dir is None:
+        raise ValueError('no airfoil cache directory given')
+    with open(name, 'rb') as f:
+        content = f.read()
+    path = os.path.join(cache_dir, hashlib.sha1(content).hexdigest() + '.npy')
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # written under a temporary name so concurrent readers never see
+        # a partial file
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp, 'wb') as f:
+            np.save(f, np.vstack(parse_selig(content)))
+        os.replace(tmp, path)
+    return path
+
+
+def load_airfoil(name, cache_dir=None):
+    """Loads the coordinates of an airfoil file.
+
+    With a cache directory (argument or AEROPYTHON_CACHE_DIR), the parsed
+    coordinates are stored there under the hash of the file content, and
+    later loads are read-only memory maps of that binary file.
+
+    Arguments
+    ---------
+    name -- path of the airfoil file.
+    cache_dir -- cache directory, CACHE_DIR by default.
+
+    Returns
+    -------
+    x, y -- Numpy 1d arrays (float) of the coordinates, in file order.
+    """
+    if (cache_dir or CACHE_DIR) is None:
+        with open(name, 'rb') as f:
+            return parse_selig(f.read())
+    points = np.load(cache_path(name, cache_dir), mmap_mode='r')
+    return points[0], points[1]
@@ -0,0 +1,119 @@
+import concurrent.futures
+import contextlib
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+
+from .airfoil import cache_path, close_trailing_edge
+from .profiling import profiled
+from .solver import polar
+
+
+# scalar results of a polar kept in the batch table
+FIELDS = ('alpha', 'cl', 'cl_p', 'cd_p', 'cm_p')
+
+
+def _polar_job(path, alphas, Vinf):
+    """Computes the polar of one airfoil in a worker process.
+
+    The geometry is read from its binary cache file as a memory map, so
+    only the path crosses the process boundary.
+    """
+    points = np.load(path, mmap_mode='r')
+    result = polar(close_trailing_edge(points[0], points[1]), alphas, Vinf)
+    # only the scalar fields are sent back
+    records = np.empty(result.size, dtype=[(name, float) for name in FIELDS])
+    for name in FIELDS:
+        records[name] = result[name]
+    return records
+
+
+def iter_batch(names, alphas, workers=None, alpha_chunk=None, cache_dir=None,
+               Vinf=1.0):
+    """Computes the polars of many airfoils on a pool of processes and
+    yields the results as they complete.
+
+    The workers are started with 'spawn', so a script calling this must
+    guard its entry point with if __name__ == '__main__'.
+
+    Parameters
+    ----------
+    names: list of strings
+        Paths of Selig-style airfoil files.
+    alphas: Numpy 1d array (float)
+        Angles of attack in degrees.
+    workers: integer, optional
+        Number of worker processes, os.cpu_count() by default.
+    alpha_chunk: integer, optional
+        Number of angles per job; all the angles of an airfoil are one job
+        by default.
+    cache_dir: string, optional
+        Directory of the binary geometry files handed to the workers, a
+        temporary directory by default.
+    Vinf: float
+        Freestream speed.
+
+    Yields
+    ------
+    name, result: string and Numpy structured array
+        Airfoil path and its records for one chunk of angles.
+    """
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=float))
+    alpha_chunk = alpha_chunk or alphas.size
+    # a temporary directory only when the caller gives none
+    directory = (tempfile.TemporaryDirectory() if cache_dir is None
+                 else contextlib.nullcontext(cache_dir))
+    with directory as cache_dir:
+        # fresh interpreters: forking a process that has started the
+        # threads of the Numba kernels leaves it hanging at exit
+        with concurrent.futures.ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context('spawn')
+                ) as executor:
+            jobs = {}
+            for name in names:
+                # parsed once here, memory-mapped by the workers
+                path = cache_path(name, cache_dir)
+                for start in range(0, alphas.size, alpha_chunk):
+                    job = executor.submit(_polar_job, path,
+                                          alphas[start:start+alpha_chunk], Vinf)
+                    jobs[job] = name
+            for job in concurrent.futures.as_completed(jobs):
+                yield jobs[job], job.result()
+
+
+@profiled()
+def run_batch(names, alphas, workers=None, alpha_chunk=None, cache_dir=None,
+              Vinf=1.0, callback=None):
+    """Computes the polars of many airfoils and gathers them in one table.
+
+    The arguments are those of iter_batch; callback(name, result) is
+    called for every chunk of results as soon as it arrives.
+
+    Returns
+    -------
+    table: Numpy structured array
+        One record per airfoil and angle, with fields 'airfoil', 'alpha',
+        'cl', 'cl_p', 'cd_p' and 'cm_p', sorted by airfoil then angle.
+    """
+    names = list(names)
+    width = max([len(os.fspath(name)) for name in names] + [1])
+    dtype = [('airfoil', 'U{}'.format(width))] + [(f, float) for f in FIELDS]
+    chunks = []
+    for name, result in iter_batch(names, alphas, workers, alpha_chunk,
+                                   cache_dir, Vinf):
+        if callback is not None:
+            callback(name, result)
+        chunk = np.empty(result.size, dtype=dtype)
+        chunk['airfoil'] = os.fspath(name)
+        for field in FIELDS:
+            chunk[field] = result[field]
+        chunks.append(chunk)
+    if not chunks:
+        return np.empty(0, dtype=dtype)
+    table = np.concatenate(chunks)
+    order = {os.fspath(name): i for i, name in enumerate(names)}
+    table = table[np.lexsort((table['alpha'],
+                              [order[name] for name in table['airfoil']]))]
+    return table
@@ -0,0 +1,83 @@
+import collections
+import os
+
+import numpy as np
+
+
+class InfluenceCache:
+    """Memoizes the assembled matrices of panel geometries.
+
+    Entries are dictionaries of arrays (influence matrices, LU factors...)
+    keyed by a geometry hash such as PanelSet.geometry_key(). The least
+    recently used entries are evicted once the arrays held exceed
+    max_bytes. With a directory, entries are also saved there as .npz
+    files and reloaded on a miss, so that a new process does not assemble
+    the same geometry again.
+    """
+    def __init__(self, max_bytes=256*2**20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.nbytes = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, build):
+        """Returns the entry of a key, building it with build() on a miss.
+
+        Arguments
+        ---------
+        key -- geometry hash.
+        build -- function returning the dictionary of arrays of the entry.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        entry = self._load(key)
+        if entry is None:
+            entry = build()
+            self._save(key, entry)
+        self._entries[key] = entry
+        self.nbytes += _entry_nbytes(entry)
+        self._evict()
+        return entry
+
+    def clear(self):
+        """Forgets the entries held in memory (files on disk are kept)."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def _evict(self):
+        # the most recent entry is kept even if it exceeds the budget alone
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.nbytes -= _entry_nbytes(entry)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _load(self, key):
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        with np.load(self._path(key)) as data:
+            return dict(data)
+
+    def _save(self, key, entry):
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = '{}.{}.tmp.npz'.format(self._path(key), os.getpid())
+        np.savez(tmp, **entry)
+        os.replace(tmp, self._path(key))
+
+
+def _entry_nbytes(entry):
+    return sum(np.asarray(array).nbytes for array in entry.values())
+
+
+# cache used by the solvers when none is given
+default_cache = InfluenceCache()
@@ -0,0 +1,385 @@
+"""Command-line entry point: python -m aeropython <command> [options].
+
+Every command runs without display and writes its results as a table,
+in CSV (the default, on the standard output) or NPZ according to the
+extension of --output; the profile of its stages (see
+aeropython.profiling) is printed on the standard error and, with
+--summary, written in a JSON file together with the parameters and the
+scalar results. The options can also be given in a JSON file with
+--config: its top-level keys are option names (alpha, airfoil...) and
+a section named after the command overrides them; every option must
+exist for the command, and the values are converted as on the command
+line. Options given on the command line take precedence.
+"""
+import argparse
+import csv
+import json
+import sys
+
+import numpy as np
+
+from . import profiling
+from .singularities import doublet, freeStream, sourceSink, vortex
+
+
+# singularity types of the field command
+ELEMENTS = {'source': sourceSink, 'doublet': doublet, 'vortex': vortex}
+
+
+def write_table(path, columns, compress=False):
+    """Writes columns (a dict of 1d arrays of the same length) as CSV, or
+    as NPZ if path ends with .npz; '-' is the standard output (CSV)."""
+    if path != '-' and path.endswith('.npz'):
+        save = np.savez_compressed if compress else np.savez
+        save(path, **columns)
+        return
+    names = list(columns)
+    rows = zip(*[np.asarray(columns[name]).tolist() for name in names])
+    stream = sys.stdout if path == '-' else open(path, 'w', newline='')
+    try:
+        writer = csv.writer(stream)
+        writer.writerow(names)
+        # repr keeps all the digits of the floats
+        writer.writerows([[repr(value) if isinstance(value, float) else value
+                           for value in row] for row in rows])
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+def arange(start, stop, step):
+    """Angles from start to stop included."""
+    return np.arange(start, stop + 0.5*step, step)
+
+
+def run_panel(args):
+    """Solves the panel system of a profile at one angle of attack."""
+    from .panels import PanelSet
+    from .solver import PanelSolver, pressure_coefficients, read_profile
+    with profiling.stage('geometry'):
+        panels = PanelSet.from_ends(*read_profile(args.airfoil))
+    with profiling.stage('solve'):
+        solver = PanelSolver.for_geometry(panels)
+        sigma, gamma = solver.solve(args.alpha, args.Vinf)
+        vt, cp = solver.surface_velocity(sigma, gamma, args.alpha, args.Vinf)
+        chord = panels.xa.max() - panels.xa.min()
+        cl = gamma*panels.length.sum()/(0.5*args.Vinf*chord)
+        cl_p, cd_p, cm_p = pressure_coefficients(panels, cp, args.alpha)
+    columns = {'xa': panels.xa, 'ya': panels.ya, 'xb': panels.xb,
+               'yb': panels.yb, 'xc': panels.xc, 'yc': panels.yc,
+               'sigma': sigma, 'vt': vt, 'cp': cp}
+    results = {'gamma': gamma, 'cl': cl, 'cl_p': cl_p, 'cd_p': cd_p,
+               'cm_p': cm_p}
+    return columns, results
+
+
+def run_polar(args):
+    """Computes the polars of one or several profiles."""
+    from .batch import FIELDS, run_batch
+    from .solver import polar
+    alphas = arange(*args.alpha_range)
+    with profiling.stage('polar'):
+        if len(args.airfoil) > 1 and args.workers != 1:
+            table = run_batch(args.airfoil, alphas, args.workers,
+                              Vinf=args.Vinf)
+            columns = {name: table[name] for name in ('airfoil',) + FIELDS}
+        else:
+            columns = {name: [] for name in ('airfoil',) + FIELDS}
+            for name in args.airfoil:
+                result = polar(name, alphas, args.Vinf)
+                columns['airfoil'].extend([name]*alphas.size)
+                for field in FIELDS:
+                    columns[field].extend(result[field])
+    results = {'profiles': len(args.airfoil), 'angles': int(alphas.size)}
+    return columns, results
+
+
+def run_field(args):
+    """Evaluates the flow of point singularities on a grid."""
+    from .multipole import evaluate
+    with profiling.stage('setup'):
+        elements = []
+        for kind, strength, x, y in args.element:
+            if kind not in ELEMENTS:
+                raise ValueError('unknown singularity: {}'.format(kind))
+            elements.append(ELEMENTS[kind](float(strength), float(x),
+                                           float(y)))
+        X, Y = np.meshgrid(np.linspace(*args.x_range, args.n[0]),
+                           np.linspace(*args.y_range, args.n[1]))
+    with profiling.stage('evaluate'):
+        if elements:
+            u, v, psi = evaluate(elements, X, Y, args.method, args.theta,
+                                 workers=args.workers)
+        else:
+            u, v, psi = np.zeros_like(X), np.zeros_like(X), np.zeros_like(X)
+        Vinf = freeStream(args.Vinf, args.alpha)
+        u += Vinf.u
+        v += Vinf.v
+        psi += Vinf.u*Y - Vinf.v*X
+    columns = {'x': X.ravel(), 'y': Y.ravel(), 'u': u.ravel(),
+               'v': v.ravel(), 'psi': psi.ravel()}
+    results = {'elements': len(elements), 'points': int(X.size)}
+    return columns, results
+
+
+def run_darrieus(args):
+    """Evaluates the blade incidence of a Darrieus rotor for one or several
+    angular speeds, or optimizes the rotor and its vortices."""
+    from . import rotor
+    if args.optimize:
+        with profiling.stage('optimize'):
+            best = rotor.optimize(args.vortices, args.r0, args.target,
+                                  Vinf=args.Vinf, alpha=args.alpha,
+                                  n_azimuth=args.azimuths,
+                                  processes=args.workers or 1,
+                                  maxiter=args.maxiter, seed=args.seed)
+        omega = np.array([best.omega])
+        gamma, x, y = best.gamma, best.x_vortices, best.y_vortices
+        results = {'generations': int(best.history.size),
+                   'gamma': gamma.tolist(), 'x': x.tolist(), 'y': y.tolist()}
+    else:
+        omega = np.asarray(args.omega, dtype=float)
+        vortices = np.array(args.vortex, dtype=float).reshape(-1, 3)
+        gamma, x, y = vortices.T
+        results = {}
+    with profiling.stage('sweep'):
+        theta, incid, scores = rotor.sweep(args.r0, omega, args.target,
+                                           gamma, x, y, args.Vinf, args.alpha,
+                                           args.azimuths)
+    columns = {'omega': np.repeat(omega, theta.size),
+               'theta': np.tile(theta, omega.size),
+               'incidence': incid.ravel()}
+    results.update(omega=omega.tolist(), score=np.ravel(scores).tolist())
+    return columns, results
+
+
+def _add_output(parser):
+    """Adds the output options shared by the commands."""
+    parser.add_argument('-o', '--output', default='-',
+                        help='result table, .csv or .npz (default: CSV on '
+                             'the standard output)')
+    parser.add_argument('--compress', action='store_true',
+                        help='compress the NPZ output')
+    parser.add_argument('--summary',
+                        help='JSON file receiving the parameters, the '
+                             'scalar results and the profile')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='do not print the profile')
+    parser.add_argument('--profile-json',
+                        help='JSON file receiving the profile of the solver '
+                             'stages (see aeropython.profiling)')
+    parser.add_argument('--profile-trace',
+                        help='Chrome trace file of the solver stages')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='measure the peak memory of the stages')
+
+
+def build_parser():
+    """Returns the argument parser of the commands."""
+    parser = argparse.ArgumentParser(
+        prog='python -m aeropython',
+        description='Headless panel, polar, field and rotor computations.')
+    parser.add_argument('--config',
+                        help='JSON file of option values (see the module '
+                             'documentation)')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    panel = commands.add_parser('panel', help='panel solution of a profile')
+    panel.add_argument('--airfoil', default='NACAcamber0012.dat',
+                       help='Selig-style airfoil file')
+    panel.add_argument('--alpha', type=float, default=0.,
+                       help='angle of attack in degrees')
+    panel.add_argument('--Vinf', type=float, default=1.0,
+                       help='freestream speed')
+    panel.set_defaults(run=run_panel)
+
+    polar = commands.add_parser('polar', help='polars of profiles')
+    polar.add_argument('--airfoil', nargs='+', default=['NACAcamber0012.dat'],
+                       help='Selig-style airfoil files')
+    polar.add_argument('--alpha-range', nargs=3, type=float,
+                       default=[-4., 10., 1.], metavar=('START', 'STOP', 'STEP'),
+                       help='angles of attack in degrees, STOP included')
+    polar.add_argument('--Vinf', type=float, default=1.0,
+                       help='freestream speed')
+    polar.add_argument('--workers', type=int,
+                       help='worker processes for several profiles')
+    polar.set_defaults(run=run_polar)
+
+    field = commands.add_parser('field',
+                                help='flow of point singularities on a grid')
+    field.add_argument('--element', nargs=4, action='append', default=[],
+                       metavar=('TYPE', 'STRENGTH', 'X', 'Y'),
+                       help='singularity ({}), repeatable'.format(
+                           ', '.join(ELEMENTS)))
+    field.add_argument('--x-range', nargs=2, type=float, default=[-2., 2.],
+                       metavar=('MIN', 'MAX'))
+    field.add_argument('--y-range', nargs=2, type=float, default=[-2., 2.],
+                       metavar=('MIN', 'MAX'))
+    field.add_argument('--n', nargs=2, type=int, default=[100, 100],
+                       metavar=('NX', 'NY'), help='number of grid points')
+    field.add_argument('--Vinf', type=float, default=1.0,
+                       help='freestream speed')
+    field.add_argument('--alpha', type=float, default=0.,
+                       help='freestream direction in degrees')
+    field.add_argument('--method', choices=('tree', 'direct'), default='tree')
+    field.add_argument('--theta', type=float, default=0.5,
+                       help='opening ratio of the tree-code')
+    field.add_argument('--workers', type=int, help='threads of the direct sum')
+    field.set_defaults(run=run_field)
+
+    darrieus = commands.add_parser('darrieus',
+                                   help='blade incidence of a Darrieus rotor')
+    darrieus.add_argument('--r0', type=float, default=0.75,
+                          help='radius of the rotor')
+    darrieus.add_argument('--omega', nargs='+', type=float, default=[5.0],
+                          help='angular speeds')
+    darrieus.add_argument('--target', type=float, default=7.0,
+                          help='target incidence in degrees')
+    darrieus.add_argument('--vortex', nargs=3, type=float, action='append',
+                          default=[], metavar=('GAMMA', 'X', 'Y'),
+                          help='vortex around the rotor, repeatable')
+    darrieus.add_argument('--Vinf', type=float, default=1.5,
+                          help='freestream speed')
+    darrieus.add_argument('--alpha', type=float, default=0.,
+                          help='freestream direction in degrees')
+    darrieus.add_argument('--azimuths', type=int, default=40,
+                          help='blade positions over a revolution')
+    darrieus.add_argument('--optimize', action='store_true',
+                          help='optimize omega and the vortices instead')
+    darrieus.add_argument('--vortices', type=int, default=2,
+                          help='number of optimized vortices')
+    darrieus.add_argument('--maxiter', type=int, default=100,
+                          help='generations of the optimization')
+    darrieus.add_argument('--seed', type=int, help='seed of the optimization')
+    darrieus.add_argument('--workers', type=int,
+                          help='processes scoring the population')
+    darrieus.set_defaults(run=run_darrieus)
+
+    for command in (panel, polar, field, darrieus):
+        _add_output(command)
+    return parser, commands.choices
+
+
+def _config_value(action, value):
+    """Converts a config value as the command line would convert it."""
+    if action.nargs == 0:
+        # flags such as store_true
+        if not isinstance(value, bool):
+            raise ValueError('expected true or false')
+        return action.const if value else action.default
+    if value is None:
+        return None
+    if isinstance(action, argparse._AppendAction):
+        if not isinstance(value, list):
+            raise ValueError('expected a list')
+        return [_config_item(action, item) for item in value]
+    return _config_item(action, value)
+
+
+def _config_item(action, value):
+    if action.nargs is None:
+        if isinstance(value, (list, dict)):
+            raise ValueError('expected a single value')
+        return _config_scalar(action, value)
+    if not isinstance(value, list):
+        value = [value]
+    if isinstance(action.nargs, int) and len(value) != action.nargs:
+        raise ValueError('expected {} values'.format(action.nargs))
+    if action.nargs == '+' and not value:
+        raise ValueError('expected at least one value')
+    return [_config_scalar(action, item) for item in value]
+
+
+def _config_scalar(action, value):
+    if isinstance(value, (list, dict)) or (isinstance(value, bool)
+                                           and action.type is not None):
+        raise ValueError('invalid value: {!r}'.format(value))
+    # through str, as on the command line: 4.5 is not a valid int
+    try:
+        value = (action.type or str)(str(value))
+    except (TypeError, ValueError):
+        raise ValueError('invalid value: {!r}'.format(value)) from None
+    if action.choices is not None and value not in action.choices:
+        raise ValueError('invalid choice: {!r}'.format(value))
+    return value
+
+
+def load_config(path, command, commands):
+    """Returns the option values of a config file for a command, converted
+    to the types of the options.
+
+    Arguments
+    ---------
+    path -- JSON config file.
+    command -- name of the command.
+    commands -- parsers of the commands, by name.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError('{}: the configuration must be a JSON object'
+                         .format(path))
+    sections = {key for key, value in config.items()
+                if isinstance(value, dict)}
+    unknown = sorted(sections - set(commands))
+    if unknown:
+        raise ValueError('{}: unknown commands: {}'.format(
+            path, ', '.join(unknown)))
+    # the top-level options, overridden by those of the command section
+    values = {key: value for key, value in config.items()
+              if key not in sections}
+    values.update(config.get(command, {}))
+    actions = {action.dest: action for action in commands[command]._actions
+               if not isinstance(action, argparse._HelpAction)}
+    unknown = sorted(set(values) - set(actions))
+    if unknown:
+        raise ValueError('{}: unknown options for {}: {}'.format(
+            path, command, ', '.join(unknown)))
+    for key, value in values.items():
+        try:
+            values[key] = _config_value(actions[key], value)
+        except ValueError as error:
+            raise ValueError('{}: {}: {}'.format(path, key, error)) from None
+    return values
+
+
+def main(argv=None):
+    """Runs a command; returns the exit status."""
+    parser, commands = build_parser()
+    args = parser.parse_args(argv)
+    if args.config:
+        try:
+            values = load_config(args.config, args.command, commands)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+        # the config values become defaults, the command line wins
+        commands[args.command].set_defaults(**values)
+        args = parser.parse_args(argv)
+    profiler = profiling.enable(memory=args.profile_memory)
+    try:
+        with profiling.stage(args.command):
+            columns, results = args.run(args)
+        with profiling.stage('write'):
+            write_table(args.output, columns, args.compress)
+    except (OSError, ValueError) as error:
+        sys.stderr.write('{}: error: {}\n'.format(parser.prog, error))
+        return 1
+    finally:
+        profiling.disable()
+    if not args.quiet:
+        sys.stderr.write(profiler.format() + '\n')
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+    if args.profile_trace:
+        profiler.write_chrome_trace(args.profile_trace)
+    if args.summary:
+        options = {key: value for key, value in vars(args).items()
+                   if key != 'run'}
+        summary = {'command': args.command, 'options': options,
+                   'results': {key: np.asarray(value).tolist()
+                               for key, value in results.items()},
+                   'profile': profiler.report()}
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0
@@ -0,0 +1,238 @@
+import numpy as np
+
+from .kernels import numba_kernels
+from .panels import PanelSet, as_panel_set
+from .parallel import map_tiles
+from .profiling import count, profiled
+
+
+def analytic_integral(x, y, xa, ya, beta, length, dxdz, dydz):
+    """Evaluates exactly the contribution of a constant-strength panel
+    at one or several points.
+
+    The integrand is the one of `cylinder.integral`,
+
+        ((x-xs)*dxdz + (y-ys)*dydz) / ((x-xs)**2 + (y-ys)**2)
+
+    with xs = xa - sin(beta)*s, ys = ya + cos(beta)*s and s in [0, length].
+    Written in the local frame of the panel (xi along the panel, eta along
+    its normal) it integrates to an angle term and a log term, so no
+    quadrature is needed. All arguments are broadcast against each other.
+
+    On the panel itself (eta = 0, 0 < xi < length) the angle term takes
+    its limit from the normal side of the panel, which is the one giving
+    the 0.5 self-contribution of the source matrix.
+
+    Parameters
+    ----------
+    x, y: float or Numpy array (float)
+        Cartesian coordinates of the points.
+    xa, ya: float or Numpy array (float)
+        Coordinates of the first end-point of the panels.
+    beta: float or Numpy array (float)
+        Orientation of the panels (angle between x-axis and normal).
+    length: float or Numpy array (float)
+        Length of the panels.
+    dxdz, dydz: float or Numpy array (float)
+        Components of the direction the influence is projected on.
+
+    Returns
+    -------
+    I: float or Numpy array (float)
+        Integral over the panels of the influence at the points.
+    """
+    cos_b, sin_b = np.cos(beta), np.sin(beta)
+    dx, dy = x - xa, y - ya
+    # coordinates of the point in the frame of the panel
+    xi = -dx*sin_b + dy*cos_b
+    eta = dx*cos_b + dy*sin_b
+    # projection of the direction on the normal and on the tangent
+    dn = dxdz*cos_b + dydz*sin_b
+    dt = -dxdz*sin_b + dydz*cos_b
+    theta, log_term = _angle_and_log(xi, eta, length)
+    return dn*theta + dt*log_term
+
+
+def _angle_and_log(xi, eta, length):
+    """Returns the two elementary integrals of a panel in its own frame.
+
+    theta is the angle under which the panel is seen from the point,
+    log_term is 0.5*log(r_a**2/r_b**2) with r_a, r_b the distances to
+    the end-points.
+    """
+    xi_b = xi - length
+    on_panel = (np.abs(eta) <= 1e-12*length) & (xi > 0.) & (xi_b < 0.)
+    theta = np.where(on_panel, np.pi,
+                     np.arctan2(eta*length, eta*eta + xi*xi_b))
+    log_term = 0.5*np.log((xi*xi + eta*eta)/(xi_b*xi_b + eta*eta))
+    return theta, log_term
+
+
+def panel_arrays(panels):
+    """Returns the geometry arrays of the panels used by the kernels.
+
+    Parameters
+    ----------
+    panels: PanelSet or Numpy 1d array (Panel object)
+        List of panels.
+
+    Returns
+    -------
+    xa, ya, beta, length, xc, yc: Numpy 1d arrays (float)
+        First end-points, orientations, lengths and center-points.
+    """
+    panels = as_panel_set(panels)
+    return (panels.xa, panels.ya, panels.beta, panels.length,
+            panels.xc, panels.yc)
+
+
+@profiled()
+def influence_matrices(xa, ya, beta, length, xc, yc, workers=None):
+    """Builds in one pass the source contribution matrices for the normal
+    and the tangential velocity at the center-points of the panels.
+
+    Blocks of rows are assembled on a thread pool.
+
+    The vortex matrices follow from the same pass: the vortex contribution
+    on the normal velocity is the source contribution on the tangential
+    velocity, and the vortex contribution on the tangential velocity is the
+    opposite of the source contribution on the normal velocity.
+
+    Parameters
+    ----------
+    xa, ya: Numpy 1d array (float)
+        Coordinates of the first end-point of the panels.
+    beta: Numpy 1d array (float)
+        Orientation of the panels.
+    length: Numpy 1d array (float)
+        Length of the panels.
+    xc, yc: Numpy 1d array (float)
+        Coordinates of the center-point of the panels.
+    workers: integer, optional
+        Number of threads (see parallel.num_threads).
+
+    Returns
+    -------
+    A_normal: Numpy 2d array (float)
+        Source contribution matrix for the normal velocity (0.5 diagonal).
+    A_tangential: Numpy 2d array (float)
+        Source contribution matrix for the tangential velocity (0.0 diagonal).
+    """
+    count('panel_pairs', xc.size*xa.size)
+    A_normal = np.empty((xc.size, xa.size), dtype=float)
+    A_tangential = np.empty((xc.size, xa.size), dtype=float)
+    jit = numba_kernels(workers)
+    if jit is not None:
+        jit.influence_matrices(*[np.ascontiguousarray(a, dtype=float)
+                                 for a in (xa, ya, beta, length, xc, yc)],
+                               A_normal, A_tangential)
+        return A_normal, A_tangential
+    cos_b, sin_b = np.cos(beta), np.sin(beta)
+
+    def rows(block):
+        # rows are the control-points, columns the panels
+        dx = xc[block, np.newaxis] - xa
+        dy = yc[block, np.newaxis] - ya
+        xi = -dx*sin_b + dy*cos_b
+        eta = dx*cos_b + dy*sin_b
+        theta, log_term = _angle_and_log(xi, eta, length)
+        # relative orientation of the control-point panel and the source panel
+        delta = beta[block, np.newaxis] - beta
+        cos_d, sin_d = np.cos(delta), np.sin(delta)
+        A_normal[block] = 0.5/np.pi*(cos_d*theta + sin_d*log_term)
+        A_tangential[block] = 0.5/np.pi*(cos_d*log_term - sin_d*theta)
+
+    map_tiles(rows, xc.size, max(1, 2**16//max(1, xa.size)), workers)
+    np.fill_diagonal(A_normal, 0.5)
+    np.fill_diagonal(A_tangential, 0.0)
+    return A_normal, A_tangential
+
+
+@profiled()
+def panel_velocity(panels, x, y, chunk_size=None, workers=None):
+    """Returns the velocity induced by the source and vortex panels at
+    arbitrary points (mesh grid, scattered probes, streamline seeds...).
+
+    The points are processed by chunks, on a thread pool, so that the
+    temporary arrays of a thread never hold more than chunk_size*N_panels
+    values.
+
+    Parameters
+    ----------
+    panels: PanelSet or Numpy 1d array (Panel object)
+        Panels with their source (sigma) and vortex (gamma) strengths.
+    x, y: Numpy array (float)
+        Coordinates of the points, of any (broadcastable) shape.
+    chunk_size: integer, optional
+        Number of points evaluated at once; by default about 2**18 values
+        per temporary array.
+    workers: integer, optional
+        Number of threads (see parallel.num_threads).
+
+    Returns
+    -------
+    u, v: Numpy arrays (float)
+        Induced velocity components, with the shape of the points.
+    """
+    panels = as_panel_set(panels)
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float),
+                               np.asarray(y, dtype=float))
+    shape = x.shape
+    x, y = x.ravel(), y.ravel()
+    count('panel_point_pairs', x.size*panels.size)
+    u, v = np.empty(x.size, dtype=float), np.empty(x.size, dtype=float)
+    jit = numba_kernels(workers)
+    if jit is not None:
+        jit.panel_velocity(np.ascontiguousarray(x), np.ascontiguousarray(y),
+                           panels.xa, panels.ya, panels.beta, panels.length,
+                           panels.sigma, panels.gamma, u, v)
+        return u.reshape(shape), v.reshape(shape)
+    if chunk_size is None:
+        chunk_size = max(1, 2**18//max(1, panels.size))
+    cos_b, sin_b = np.cos(panels.beta), np.sin(panels.beta)
+
+    def chunk_velocity(chunk):
+        dx = x[chunk, np.newaxis] - panels.xa
+        dy = y[chunk, np.newaxis] - panels.ya
+        xi = -dx*sin_b + dy*cos_b
+        eta = dx*cos_b + dy*sin_b
+        theta, log_term = _angle_and_log(xi, eta, panels.length)
+        # integrals of the influence along x and along y
+        int_x = theta*cos_b - log_term*sin_b
+        int_y = theta*sin_b + log_term*cos_b
+        u[chunk] = 0.5/np.pi*(int_x.dot(panels.sigma) + int_y.dot(panels.gamma))
+        v[chunk] = 0.5/np.pi*(int_y.dot(panels.sigma) - int_x.dot(panels.gamma))
+
+    map_tiles(chunk_velocity, x.size, chunk_size, workers)
+    return u.reshape(shape), v.reshape(shape)
+
+
+def sheet_velocity(x, y, xa, ya, xb, yb, sigma=0., gamma=0., chunk_size=None,
+                   workers=None):
+    """Returns the velocity induced by straight source and vortex sheets of
+    uniform strength at arbitrary points, with the exact panel integrals.
+
+    Parameters
+    ----------
+    x, y: Numpy array (float)
+        Coordinates of the points, of any (broadcastable) shape.
+    xa, ya, xb, yb: float or Numpy 1d arrays (float)
+        End-points of the sheets.
+    sigma, gamma: float or Numpy 1d arrays (float)
+        Source and vortex strengths per unit length of the sheets, with the
+        conventions of the panels.
+    chunk_size, workers: integer, optional
+        See panel_velocity.
+
+    Returns
+    -------
+    u, v: Numpy arrays (float)
+        Induced velocity components, with the shape of the points.
+    """
+    xa, ya, xb, yb, sigma, gamma = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(a, dtype=float))
+          for a in (xa, ya, xb, yb, sigma, gamma)])
+    sheets = PanelSet(xa, ya, xb, yb)
+    sheets.sigma[:] = sigma
+    sheets.gamma[:] = gamma
+    return panel_velocity(sheets, x, y, chunk_size, workers)
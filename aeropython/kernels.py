@@ -0,0 +1,67 @@
+import importlib.util
+import os
+
+from .parallel import num_threads
+
+
+# environment variable choosing the default backend, 'numpy' or 'numba'
+BACKEND_ENV = 'AEROPYTHON_BACKEND'
+
+BACKENDS = ('numpy', 'numba')
+
+_backend = None
+
+
+def numba_available():
+    """Whether Numba is installed (without importing it)."""
+    return importlib.util.find_spec('numba') is not None
+
+
+def set_backend(name):
+    """Selects the implementation of the influence kernels.
+
+    Arguments
+    ---------
+    name -- 'numpy' (vectorized NumPy, always available) or 'numba'
+            (compiled loops, needs Numba).
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError('unknown backend: {}'.format(name))
+    if name == 'numba' and not numba_available():
+        raise ImportError('the numba backend needs numba')
+    _backend = name
+
+
+def get_backend():
+    """Returns the backend of the influence kernels.
+
+    By default it is the one of the AEROPYTHON_BACKEND environment
+    variable, or 'numba' when Numba is installed; a 'numba' request falls
+    back to 'numpy' without Numba.
+    """
+    global _backend
+    if _backend is None:
+        name = os.environ.get(BACKEND_ENV, 'numba')
+        if name not in BACKENDS:
+            raise ValueError('unknown {}: {}'.format(BACKEND_ENV, name))
+        _backend = name if name == 'numpy' or numba_available() else 'numpy'
+    return _backend
+
+
+def numba_kernels(workers=None):
+    """Returns the module of the compiled kernels, if the numba backend is
+    selected, after setting the number of threads; None otherwise.
+
+    Arguments
+    ---------
+    workers -- number of threads (see parallel.num_threads).
+    """
+    if get_backend() != 'numba':
+        return None
+    # imported here: importing Numba takes longer than the rest of the code
+    import numba
+    from . import kernels_numba
+    numba.set_num_threads(min(num_threads(workers),
+                              numba.config.NUMBA_NUM_THREADS))
+    return kernels_numba
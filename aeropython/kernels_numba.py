@@ -0,0 +1,104 @@
+"""Numba versions of the influence kernels, compiled on first use.
+
+Each function fills preallocated outputs with one loop over the targets
+run in parallel (prange); the sum over the panels or singularities of a
+target is a sequential loop, so the results do not depend on the number
+of threads. The compiled code is cached on disk next to this file.
+"""
+import cmath
+import math
+
+import numba
+import numpy as np
+
+
+# fastmath without the no-nan/no-inf assumptions: the log term of a panel is
+# infinite at its end-points
+FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+@numba.njit(cache=True, fastmath=FASTMATH)
+def angle_and_log(xi, eta, length):
+    """Scalar version of influence._angle_and_log."""
+    xi_b = xi - length
+    if abs(eta) <= 1e-12*length and xi > 0. and xi_b < 0.:
+        theta = math.pi
+    else:
+        theta = math.atan2(eta*length, eta*eta + xi*xi_b)
+    log_term = 0.5*math.log((xi*xi + eta*eta)/(xi_b*xi_b + eta*eta))
+    return theta, log_term
+
+
+@numba.njit(cache=True, fastmath=FASTMATH, parallel=True)
+def influence_matrices(xa, ya, beta, length, xc, yc, A_normal, A_tangential):
+    """Fills the matrices of influence.influence_matrices."""
+    cos_b, sin_b = np.cos(beta), np.sin(beta)
+    for i in numba.prange(xc.size):
+        for j in range(xa.size):
+            if i == j:
+                A_normal[i, j] = 0.5
+                A_tangential[i, j] = 0.
+                continue
+            dx, dy = xc[i] - xa[j], yc[i] - ya[j]
+            xi = -dx*sin_b[j] + dy*cos_b[j]
+            eta = dx*cos_b[j] + dy*sin_b[j]
+            theta, log_term = angle_and_log(xi, eta, length[j])
+            cos_d = cos_b[i]*cos_b[j] + sin_b[i]*sin_b[j]
+            sin_d = sin_b[i]*cos_b[j] - cos_b[i]*sin_b[j]
+            A_normal[i, j] = 0.5/math.pi*(cos_d*theta + sin_d*log_term)
+            A_tangential[i, j] = 0.5/math.pi*(cos_d*log_term - sin_d*theta)
+
+
+@numba.njit(cache=True, fastmath=FASTMATH, parallel=True)
+def panel_velocity(x, y, xa, ya, beta, length, sigma, gamma, u, v):
+    """Fills the velocity (u, v) of influence.panel_velocity."""
+    cos_b, sin_b = np.cos(beta), np.sin(beta)
+    for i in numba.prange(x.size):
+        sum_u, sum_v = 0., 0.
+        for j in range(xa.size):
+            dx, dy = x[i] - xa[j], y[i] - ya[j]
+            xi = -dx*sin_b[j] + dy*cos_b[j]
+            eta = dx*cos_b[j] + dy*sin_b[j]
+            theta, log_term = angle_and_log(xi, eta, length[j])
+            int_x = theta*cos_b[j] - log_term*sin_b[j]
+            int_y = theta*sin_b[j] + log_term*cos_b[j]
+            sum_u += int_x*sigma[j] + int_y*gamma[j]
+            sum_v += int_y*sigma[j] - int_x*gamma[j]
+        u[i] = 0.5/math.pi*sum_u
+        v[i] = 0.5/math.pi*sum_v
+
+
+@numba.njit(cache=True, fastmath=FASTMATH, parallel=True)
+def blob_velocity(x, y, xp, yp, gamma, core, u, v):
+    """Fills the velocity (u, v) of particles.blob_velocity."""
+    inv_core2 = 1./(core*core)
+    for i in numba.prange(x.size):
+        sum_u, sum_v = 0., 0.
+        for j in range(xp.size):
+            dx, dy = x[i] - xp[j], y[i] - yp[j]
+            r2 = dx*dx + dy*dy
+            if r2 == 0.:
+                continue
+            factor = -math.expm1(-r2*inv_core2)/r2*gamma[j]
+            sum_u -= factor*dy
+            sum_v += factor*dx
+        u[i] = 0.5/math.pi*sum_u
+        v[i] = 0.5/math.pi*sum_v
+
+
+@numba.njit(cache=True, fastmath=FASTMATH, parallel=True)
+def direct_sum(z, zs, a, b, stream, w, F):
+    """Adds the complex velocity w (and potential F) of multipole.direct_sum."""
+    for i in numba.prange(z.size):
+        sum_w, sum_F = 0j, 0j
+        for j in range(zs.size):
+            dz = z[i] - zs[j]
+            if dz == 0.:
+                continue
+            inv = 1./dz
+            sum_w += inv*(a[j] - inv*b[j])
+            if stream:
+                sum_F += cmath.log(dz)*a[j] + inv*b[j]
+        w[i] += sum_w
+        if stream:
+            F[i] += sum_F
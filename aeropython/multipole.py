@@ -0,0 +1,341 @@
+import numpy as np
+
+from .kernels import numba_kernels
+from .parallel import map_tiles
+from .profiling import count, profiled
+
+
+def singularity_coefficients(elements):
+    """Returns the complex-potential coefficients of point singularities.
+
+    Every element contributes a*log(z-z0) + b/(z-z0) to the complex
+    potential F = phi + i*psi, with the sign conventions of the sourceSink,
+    vortex and doublet classes:
+
+        source/sink (strength)  a = strength/(2*pi)
+        vortex (gamma)          a = i*gamma/(2*pi)
+        doublet (kappa)         b = kappa/(2*pi)
+
+    Parameters
+    ----------
+    elements: list of sourceSink, vortex or doublet objects
+        Point singularities, recognised by their strength attribute.
+
+    Returns
+    -------
+    x, y: Numpy 1d arrays (float)
+        Positions of the singularities.
+    a, b: Numpy 1d arrays (complex)
+        Coefficients of the logarithmic and of the pole terms.
+    """
+    n = len(elements)
+    x, y = np.empty(n, dtype=float), np.empty(n, dtype=float)
+    a, b = np.zeros(n, dtype=complex), np.zeros(n, dtype=complex)
+    for i, e in enumerate(elements):
+        x[i], y[i] = e.x, e.y
+        if hasattr(e, 'strength'):
+            a[i] = e.strength/(2*np.pi)
+        elif hasattr(e, 'gamma'):
+            a[i] = 1j*e.gamma/(2*np.pi)
+        elif hasattr(e, 'kappa'):
+            b[i] = e.kappa/(2*np.pi)
+        else:
+            raise TypeError('unknown singularity: {!r}'.format(e))
+    return x, y, a, b
+
+
+def direct_sum(z, zs, a, b, stream=True, chunk_size=None, workers=None):
+    """Sums the contributions of all singularities at every target.
+
+    The targets are processed by chunks on a thread pool.
+
+    Parameters
+    ----------
+    z: Numpy 1d array (complex)
+        Targets, x+iy.
+    zs: Numpy 1d array (complex)
+        Positions of the singularities.
+    a, b: Numpy 1d arrays (complex)
+        Coefficients of the logarithmic and of the pole terms.
+    stream: boolean
+        Whether the complex potential is needed as well as the velocity.
+    chunk_size: integer, optional
+        Number of targets evaluated at once.
+    workers: integer, optional
+        Number of threads (see parallel.num_threads).
+
+    Returns
+    -------
+    w: Numpy 1d array (complex)
+        Complex velocity u-iv at the targets.
+    F: Numpy 1d array (complex) or None
+        Complex potential phi+i*psi at the targets.
+    """
+    return _direct_sum(z, zs, a, b, stream, numba_kernels(workers),
+                       chunk_size, workers)
+
+
+def _direct_sum(z, zs, a, b, stream, jit, chunk_size=None, workers=None):
+    # direct_sum with the compiled kernels jit already resolved (None for
+    # NumPy), as for the many small sums of the tree leaves
+    w = np.zeros(z.size, dtype=complex)
+    F = np.zeros(z.size, dtype=complex) if stream else None
+    if zs.size == 0:
+        return w, F
+    count('singularity_point_pairs', z.size*zs.size)
+    if jit is not None:
+        # without stream, w stands for the unused potential
+        jit.direct_sum(np.ascontiguousarray(z, dtype=complex),
+                       np.ascontiguousarray(zs, dtype=complex),
+                       np.ascontiguousarray(a, dtype=complex),
+                       np.ascontiguousarray(b, dtype=complex), stream, w,
+                       F if stream else w)
+        return w, F
+    if chunk_size is None:
+        chunk_size = max(1, 2**18//zs.size)
+    has_log, has_pole = np.any(a), np.any(b)
+
+    def chunk_sum(chunk):
+        dz = z[chunk, np.newaxis] - zs
+        # a singularity has no influence on itself
+        coincident = dz == 0.
+        dz[coincident] = 1.
+        inv = 1./dz
+        inv[coincident] = 0.
+        if has_log:
+            w[chunk] += inv.dot(a)
+        if has_pole:
+            w[chunk] -= (inv*inv).dot(b)
+        if stream:
+            if has_log:
+                log = np.log(dz)
+                log[coincident] = 0.
+                F[chunk] += log.dot(a)
+            if has_pole:
+                F[chunk] += inv.dot(b)
+
+    map_tiles(chunk_sum, z.size, chunk_size, workers)
+    return w, F
+
+
+class SingularityTree:
+    """Quadtree of point singularities with multipole expansions.
+
+    Each cell stores the expansion of its singularities about its center,
+
+        F(z) = Q*log(z-zc) + sum_n c_n/(z-zc)**n,   n = 1..order,
+
+    and a cell is used through its expansion for the targets seen under a
+    ratio radius/distance smaller than theta; otherwise its children (or
+    its singularities, for a leaf) are visited. The error of a far-field
+    evaluation is of the order of theta**(order+1).
+
+    The cells keep their singularities when these move: refit() updates
+    centers, radii and coefficients without rebuilding the tree.
+    """
+    def __init__(self, x, y, a, b, leaf_size=64, order=16, max_depth=32):
+        self.leaf_size = leaf_size
+        self.order = order
+        self.max_depth = max_depth
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+        self.a = np.array(a, dtype=complex)
+        self.b = np.array(b, dtype=complex)
+        self.build()
+
+    @classmethod
+    def from_elements(cls, elements, **kwargs):
+        """Builds the tree of a list of sourceSink, vortex or doublet objects."""
+        return cls(*singularity_coefficients(elements), **kwargs)
+
+    @profiled()
+    def build(self):
+        """Sorts the singularities into cells and computes the expansions."""
+        # singularities of a cell are contiguous in this ordering
+        self.index = np.arange(self.x.size)
+        self.start, self.stop, self.children = [], [], []
+        if self.x.size:
+            self._split(0, self.x.size, 0)
+        self.start = np.array(self.start)
+        self.stop = np.array(self.stop)
+        self.fit()
+
+    def _split(self, start, stop, depth):
+        node = len(self.start)
+        self.start.append(start)
+        self.stop.append(stop)
+        self.children.append([])
+        if stop-start <= self.leaf_size or depth >= self.max_depth:
+            return node
+        idx = self.index[start:stop]
+        xs, ys = self.x[idx], self.y[idx]
+        xm, ym = 0.5*(xs.min()+xs.max()), 0.5*(ys.min()+ys.max())
+        quadrant = (xs > xm) + 2*(ys > ym)
+        counts = np.bincount(quadrant, minlength=4)
+        if counts.max() == idx.size:
+            # coincident singularities cannot be separated
+            return node
+        self.index[start:stop] = idx[np.argsort(quadrant, kind='stable')]
+        bounds = start + np.concatenate(([0], np.cumsum(counts)))
+        for q in range(4):
+            if counts[q]:
+                child = self._split(bounds[q], bounds[q+1], depth+1)
+                self.children[node].append(child)
+        return node
+
+    def refit(self, x=None, y=None, a=None, b=None):
+        """Updates positions and/or coefficients, keeping the cells."""
+        for name, value in (('x', x), ('y', y)):
+            if value is not None:
+                self.__dict__[name][:] = value
+        for name, value in (('a', a), ('b', b)):
+            if value is not None:
+                self.__dict__[name][:] = value
+        self.fit()
+
+    @profiled()
+    def fit(self):
+        """Computes center, radius and expansion coefficients of the cells."""
+        n_cells = len(self.start)
+        self.center = np.empty(n_cells, dtype=complex)
+        self.radius = np.empty(n_cells, dtype=float)
+        self.coeffs = np.empty((n_cells, self.order+1), dtype=complex)
+        z = (self.x + 1j*self.y)[self.index]
+        a, b = self.a[self.index], self.b[self.index]
+        powers = np.arange(1, self.order+1)
+        for node in range(n_cells):
+            cell = slice(self.start[node], self.stop[node])
+            zc = z[cell]
+            center = (0.5*(zc.real.min()+zc.real.max())
+                      + 0.5j*(zc.imag.min()+zc.imag.max()))
+            d = zc - center
+            self.center[node] = center
+            self.radius[node] = np.abs(d).max()
+            # d**(n-1) for n = 1..order
+            d_pow = np.cumprod(np.column_stack(
+                [np.ones_like(d)] + [d]*(self.order-1)), axis=1)
+            self.coeffs[node, 0] = a[cell].sum()
+            self.coeffs[node, 1:] = (-(a[cell, np.newaxis]*d_pow*d[:, np.newaxis]
+                                       /powers).sum(axis=0)
+                                     + b[cell].dot(d_pow))
+
+    @profiled()
+    def evaluate(self, x, y, theta=0.5, stream=True):
+        """Returns the complex velocity (and potential) at the targets.
+
+        Parameters
+        ----------
+        x, y: Numpy 1d arrays (float)
+            Coordinates of the targets.
+        theta: float
+            Opening ratio radius/distance below which a cell is used
+            through its expansion.
+        stream: boolean
+            Whether the complex potential is needed as well as the velocity.
+
+        Returns
+        -------
+        w: Numpy 1d array (complex)
+            Complex velocity u-iv at the targets.
+        F: Numpy 1d array (complex) or None
+            Complex potential phi+i*psi at the targets.
+        """
+        z = np.asarray(x, dtype=float) + 1j*np.asarray(y, dtype=float)
+        w = np.zeros(z.size, dtype=complex)
+        F = np.zeros(z.size, dtype=complex) if stream else None
+        if len(self.start):
+            # the backend is resolved once for all the leaves
+            jit = numba_kernels()
+            self._visit(0, np.arange(z.size), z, w, F, theta, jit)
+        return w, F
+
+    def _visit(self, node, targets, z, w, F, theta, jit):
+        dz = z[targets] - self.center[node]
+        far = self._accept(node, dz, theta)
+        if far.any():
+            self._far_field(node, targets[far], dz[far], w, F)
+            targets = targets[~far]
+        if targets.size == 0:
+            return
+        if self.children[node]:
+            for child in self.children[node]:
+                self._visit(child, targets, z, w, F, theta, jit)
+        else:
+            self._near_field(node, targets, z, w, F, jit)
+
+    def _accept(self, node, dz, theta):
+        # targets far enough to use the expansion of the cell
+        return np.abs(dz)*theta > self.radius[node]
+
+    def _far_field(self, node, targets, dz, w, F):
+        count('expansion_evaluations', targets.size)
+        c = self.coeffs[node]
+        inv = 1./dz
+        # Horner evaluation of sum c_n inv**n and of sum n c_n inv**(n+1)
+        series = np.zeros_like(dz)
+        dseries = np.zeros_like(dz)
+        for n in range(self.order, 0, -1):
+            series = (series + c[n])*inv
+            dseries = (dseries + n*c[n])*inv
+        w[targets] += c[0]*inv - dseries*inv
+        if F is not None:
+            F[targets] += c[0]*np.log(dz) + series
+
+    def _near_field(self, node, targets, z, w, F, jit):
+        idx = self.index[self.start[node]:self.stop[node]]
+        zs = self.x[idx] + 1j*self.y[idx]
+        w_near, F_near = _direct_sum(z[targets], zs, self.a[idx], self.b[idx],
+                                     F is not None, jit)
+        w[targets] += w_near
+        if F is not None:
+            F[targets] += F_near
+
+
+@profiled('multipole.evaluate')
+def evaluate(elements, x, y, method='tree', theta=0.5, order=16, leaf_size=64,
+             workers=None):
+    """Returns the velocity and stream function induced by a mixed list of
+    sourceSink, vortex and doublet objects at target points.
+
+    The tree method costs about O((N+M)log N) for N singularities and M
+    targets instead of O(N*M) for the direct sum, which remains available
+    for validation. Note that the stream function of a source is
+    multivalued: across the branch cut of a source the two methods may
+    differ by its strength.
+
+    Parameters
+    ----------
+    elements: list of sourceSink, vortex or doublet objects
+        Point singularities.
+    x, y: Numpy arrays (float)
+        Coordinates of the targets (mesh grid or any shape).
+    method: string
+        'tree' (multipole tree-code) or 'direct' (pairwise sum).
+    theta: float
+        Opening ratio of the tree-code; smaller is more accurate.
+    order: integer
+        Number of terms of the multipole expansions.
+    leaf_size: integer
+        Maximum number of singularities in a leaf cell.
+    workers: integer, optional
+        Number of threads of the direct sum (see parallel.num_threads).
+
+    Returns
+    -------
+    u, v, psi: Numpy arrays (float)
+        Velocity components and stream function at the targets.
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float),
+                               np.asarray(y, dtype=float))
+    shape = x.shape
+    xs, ys, a, b = singularity_coefficients(elements)
+    if method == 'tree':
+        tree = SingularityTree(xs, ys, a, b, leaf_size=leaf_size, order=order)
+        w, F = tree.evaluate(x.ravel(), y.ravel(), theta=theta)
+    elif method == 'direct':
+        w, F = direct_sum(x.ravel() + 1j*y.ravel(), xs + 1j*ys, a, b,
+                          workers=workers)
+    else:
+        raise ValueError('unknown method: {}'.format(method))
+    return (w.real.reshape(shape), -w.imag.reshape(shape),
+            F.imag.reshape(shape))
@@ -0,0 +1,267 @@
+import glob
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+from .profiling import profiled
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+# size reserved for the header of the appendable .npy files, large enough
+# for any step count so that it can be rewritten in place
+_NPY_HEADER_SIZE = 256
+
+# file listing the fields of an npy store, marking the directory as a store
+_MANIFEST = 'fields.json'
+_STEP_FILE = re.compile(r'step_\d+\.npz$')
+
+
+class FieldWriter:
+    """Streams the fields of an unsteady run to disk, one step at a time.
+
+    Every call to append() writes one step of every field (panel strengths,
+    surface cp, grid velocities...) and keeps nothing in memory, so the
+    memory use does not grow with the number of steps.
+
+    Two stores are available:
+
+    - 'npy': a directory holding one .npy file per field, of shape
+      (steps,) + field shape. The data is appended to the end of the file
+      and its header is rewritten after every step, so the files are
+      always valid and can be memory-mapped by np.load(mmap_mode='r'),
+      even while the run goes on. With compress=True every step is rather
+      saved as a compressed step_<i>.npz file in the directory.
+    - 'hdf5': one HDF5 file (needs h5py) with one dataset per field,
+      chunked by step and gzip-compressed if compress=True.
+
+    The backend defaults to 'hdf5' for paths ending in .h5 or .hdf5, and to
+    'npy' otherwise. An npy store is written into a new or empty directory,
+    or over an older npy store; a directory holding other files is refused,
+    and only the files of the older store are removed.
+    """
+    def __init__(self, path, backend=None, compress=False):
+        """Creates the store, replacing an older store at the same path.
+
+        Arguments
+        ---------
+        path -- directory (npy) or file (hdf5) of the store.
+        backend -- 'npy' or 'hdf5'.
+        compress -- compress the data.
+        """
+        if backend is None:
+            backend = 'hdf5' if path.endswith(('.h5', '.hdf5')) else 'npy'
+        if backend not in ('npy', 'hdf5'):
+            raise ValueError('unknown backend: {}'.format(backend))
+        if backend == 'hdf5' and h5py is None:
+            raise ImportError('the hdf5 backend needs h5py')
+        self.path = path
+        self.backend = backend
+        self.compress = compress
+        self.steps = 0
+        self._shapes = None
+        self._files = {}
+        if backend == 'hdf5':
+            self._h5 = h5py.File(path, 'w')
+        else:
+            os.makedirs(path, exist_ok=True)
+            for name in _store_files(path):
+                os.remove(os.path.join(path, name))
+            self._write_manifest()
+
+    @profiled()
+    def append(self, **fields):
+        """Writes one step of the fields.
+
+        The first step fixes the names, shapes and dtypes of the fields;
+        every later step must give the same ones.
+        """
+        fields = {name: np.asarray(value) for name, value in fields.items()}
+        shapes = {name: (value.shape, value.dtype)
+                  for name, value in fields.items()}
+        if self._shapes is None:
+            self._shapes = shapes
+            self._create()
+        elif shapes != self._shapes:
+            raise ValueError('fields differ from those of the first step')
+        if self.backend == 'hdf5':
+            for name, value in fields.items():
+                dataset = self._h5[name]
+                dataset.resize(self.steps+1, axis=0)
+                dataset[self.steps] = value
+            self._h5.flush()
+        elif self.compress:
+            np.savez_compressed(os.path.join(self.path, 'step_{}.npz'
+                                             .format(self.steps)), **fields)
+        else:
+            for name, value in fields.items():
+                self._files[name].append(value)
+        self.steps += 1
+
+    def _write_manifest(self):
+        fields = sorted(self._shapes or ())
+        with open(os.path.join(self.path, _MANIFEST), 'w') as f:
+            json.dump({'fields': fields, 'compress': self.compress}, f)
+
+    def _create(self):
+        if self.backend == 'npy':
+            self._write_manifest()
+        for name, (shape, dtype) in self._shapes.items():
+            if self.backend == 'hdf5':
+                options = {'compression': 'gzip'} if self.compress else {}
+                self._h5.create_dataset(name, (0,)+shape, dtype,
+                                        maxshape=(None,)+shape,
+                                        chunks=(1,)+shape if shape else True,
+                                        **options)
+            elif not self.compress:
+                self._files[name] = _NpyFile(os.path.join(self.path,
+                                                          name + '.npy'),
+                                             shape, dtype)
+
+    def close(self):
+        """Closes the files of the store."""
+        if self.backend == 'hdf5':
+            self._h5.close()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _store_files(path):
+    """Returns the files of the npy store in a directory, raising an error
+    if the directory holds anything else."""
+    names = set(os.listdir(path))
+    if not names:
+        return []
+    if _MANIFEST not in names:
+        raise FileExistsError('{} is not empty and is not a field store'
+                              .format(path))
+    with open(os.path.join(path, _MANIFEST)) as f:
+        manifest = json.load(f)
+    ours = {_MANIFEST} | {name + '.npy' for name in manifest['fields']}
+    ours |= {name for name in names if _STEP_FILE.match(name)}
+    others = names - ours
+    if others:
+        raise FileExistsError('{} holds files not written by FieldWriter: {}'
+                              .format(path, ', '.join(sorted(others))))
+    return sorted(names & ours)
+
+
+class _NpyFile:
+    """A .npy file growing along its first axis."""
+    def __init__(self, path, shape, dtype):
+        self.shape = shape
+        self.dtype = dtype
+        self.count = 0
+        self.file = open(path, 'wb+')
+        self._write_header()
+
+    def append(self, value):
+        self.file.seek(0, os.SEEK_END)
+        self.file.write(value.tobytes('C'))
+        self.count += 1
+        self._write_header()
+        self.file.flush()
+
+    def _write_header(self):
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype),
+                       'fortran_order': False,
+                       'shape': (self.count,) + self.shape}).encode('latin1')
+        # format 1.0: magic string, version, header length, header padded
+        # with spaces and ended by a newline
+        size = _NPY_HEADER_SIZE - 10
+        if len(header) >= size:
+            raise ValueError('field shape too large for the .npy header')
+        self.file.seek(0)
+        self.file.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', size)
+                        + header.ljust(size-1) + b'\n')
+
+    def close(self):
+        self.file.close()
+
+
+class FieldReader:
+    """Reads the stores written by FieldWriter.
+
+    Single steps are read without loading the others: the .npy files are
+    memory-mapped and the HDF5 datasets are read chunk by chunk.
+    """
+    def __init__(self, path):
+        self.path = path
+        if os.path.isfile(path):
+            if h5py is None:
+                raise ImportError('reading an HDF5 store needs h5py')
+            self._h5 = h5py.File(path, 'r')
+            self._fields = dict(self._h5.items())
+            self.steps = min([len(d) for d in self._fields.values()] or [0])
+        else:
+            self._h5 = None
+            self._fields = {}
+            for name in sorted(glob.glob(os.path.join(path, '*.npy'))):
+                key = os.path.splitext(os.path.basename(name))[0]
+                self._fields[key] = np.load(name, mmap_mode='r')
+            steps = glob.glob(os.path.join(path, 'step_*.npz'))
+            if steps:
+                self.steps = len(steps)
+            else:
+                # a run stopped during a step may leave some fields longer
+                self.steps = min([len(a) for a in self._fields.values()]
+                                 or [0])
+
+    @property
+    def fields(self):
+        """Names of the fields of the store."""
+        if self._fields or not self.steps:
+            return list(self._fields)
+        with np.load(self._step_path(0)) as data:
+            return list(data.files)
+
+    def __len__(self):
+        return self.steps
+
+    def __getitem__(self, name):
+        """Returns all the steps of a field, as a memory map (npy) or a
+        dataset (hdf5), without reading them."""
+        if name not in self._fields:
+            if self.steps and not self._fields:
+                raise KeyError('compressed stores are read with step()')
+            raise KeyError(name)
+        return self._fields[name]
+
+    def step(self, i):
+        """Returns a dictionary of the fields at step i."""
+        if i < 0:
+            i += self.steps
+        if not 0 <= i < self.steps:
+            raise IndexError('step index out of range')
+        if self._fields:
+            return {name: np.asarray(field[i])
+                    for name, field in self._fields.items()}
+        with np.load(self._step_path(i)) as data:
+            return dict(data)
+
+    def _step_path(self, i):
+        return os.path.join(self.path, 'step_{}.npz'.format(i))
+
+    def close(self):
+        if self._h5 is not None:
+            self._h5.close()
+        self._fields = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
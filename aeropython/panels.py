@@ -0,0 +1,170 @@
+import hashlib
+import math
+
+import numpy as np
+
+
+class Panel:
+    """Contains information related to a panel."""
+    def __init__(self, xa, ya, xb, yb):
+        """Initializes the panel.
+        
+        Arguments
+        ---------
+        xa, ya -- coordinates of the first end-point of the panel.
+        xb, yb -- coordinates of the second end-point of the panel.
+        """
+        self.xa, self.ya = xa, ya
+        self.xb, self.yb = xb, yb
+        
+        self.xc, self.yc = (xa+xb)/2, (ya+yb)/2       # control-point (center-point)
+        self.length = math.sqrt((xb-xa)**2+(yb-ya)**2)     # length of the panel
+        
+        # orientation of the panel (angle between x-axis and panel's normal)
+        if xb-xa <= 0.:
+            self.beta = math.acos((yb-ya)/self.length)
+        elif xb-xa > 0.:
+            self.beta = math.pi + math.acos(-(yb-ya)/self.length)
+
+        self.sigma = 0.                             # source strength
+        self.vt = 0.                                # tangential velocity
+        self.cp = 0.                                # pressure coefficient
+        self.gamma = 0.                             # vortex strength
+
+
+class PanelSet:
+    """Contains the panels of a body as contiguous arrays.
+
+    Every panel quantity is a float64 array with one entry per panel, so
+    the solvers work on whole arrays instead of Panel attributes. Indexing
+    or iterating gives PanelView objects, which behave like Panel instances
+    and read and write through to the arrays.
+    """
+    # arrays holding one value per panel
+    fields = ('xa', 'ya', 'xb', 'yb', 'xc', 'yc', 'length', 'beta',
+              'sigma', 'gamma', 'vt', 'cp')
+
+    def __init__(self, xa, ya, xb, yb):
+        """Initializes the panels.
+
+        Arguments
+        ---------
+        xa, ya -- coordinates of the first end-points of the panels.
+        xb, yb -- coordinates of the second end-points of the panels.
+        """
+        self.xa = np.array(xa, dtype=float)
+        self.ya = np.array(ya, dtype=float)
+        self.xb = np.array(xb, dtype=float)
+        self.yb = np.array(yb, dtype=float)
+
+        self.xc, self.yc = 0.5*(self.xa+self.xb), 0.5*(self.ya+self.yb)
+        self.length = np.hypot(self.xb-self.xa, self.yb-self.ya)
+
+        # orientation of the panels (angle between x-axis and panel's normal)
+        ty = (self.yb-self.ya)/self.length
+        self.beta = np.where(self.xb-self.xa <= 0.,
+                             np.arccos(np.clip(ty, -1., 1.)),
+                             np.pi + np.arccos(np.clip(-ty, -1., 1.)))
+
+        self.sigma = np.zeros(self.xa.size)         # source strength
+        self.gamma = np.zeros(self.xa.size)         # vortex strength
+        self.vt = np.zeros(self.xa.size)            # tangential velocity
+        self.cp = np.zeros(self.xa.size)            # pressure coefficient
+
+    @classmethod
+    def from_ends(cls, x_ends, y_ends):
+        """Builds the panels joining consecutive points of a contour."""
+        x_ends = np.asarray(x_ends, dtype=float)
+        y_ends = np.asarray(y_ends, dtype=float)
+        return cls(x_ends[:-1], y_ends[:-1], x_ends[1:], y_ends[1:])
+
+    @classmethod
+    def from_panels(cls, panels):
+        """Builds the arrays from a sequence of Panel objects."""
+        panel_set = cls(*[[getattr(p, name) for p in panels]
+                          for name in ('xa', 'ya', 'xb', 'yb')])
+        for name in ('sigma', 'gamma', 'vt', 'cp'):
+            panel_set.__dict__[name][:] = [getattr(p, name, 0.)
+                                           for p in panels]
+        return panel_set
+
+    @property
+    def size(self):
+        return self.xa.size
+
+    def __len__(self):
+        return self.xa.size
+
+    def __getitem__(self, i):
+        """Returns a PanelView for an integer index, and a new PanelSet
+        holding a copy of the selected panels for a slice, a boolean mask
+        or an array of indices."""
+        if not isinstance(i, (int, np.integer)):
+            return self._subset(i)
+        if i < 0:
+            i += self.xa.size
+        if not 0 <= i < self.xa.size:
+            raise IndexError('panel index out of range')
+        return PanelView(self, i)
+
+    def _subset(self, index):
+        if not isinstance(index, slice):
+            index = np.asarray(index)
+            if index.dtype != bool and not np.issubdtype(index.dtype,
+                                                          np.integer):
+                raise TypeError('panels must be indexed by integers, slices, '
+                                'integer arrays or boolean masks, not {}'
+                                .format(index.dtype))
+        subset = PanelSet(self.xa[index], self.ya[index],
+                          self.xb[index], self.yb[index])
+        for name in ('sigma', 'gamma', 'vt', 'cp'):
+            subset.__dict__[name][:] = getattr(self, name)[index]
+        return subset
+
+    def __iter__(self):
+        for i in range(self.xa.size):
+            yield PanelView(self, i)
+
+    def geometry_key(self):
+        """Returns a hash of the end-points, identifying the geometry."""
+        h = hashlib.sha1()
+        for name in ('xa', 'ya', 'xb', 'yb'):
+            h.update(np.ascontiguousarray(getattr(self, name)).tobytes())
+        return h.hexdigest()
+
+    @property
+    def x_ends(self):
+        return np.append(self.xa, self.xb[-1])
+
+    @property
+    def y_ends(self):
+        return np.append(self.ya, self.yb[-1])
+
+
+class PanelView:
+    """Gives access to one panel of a PanelSet with the Panel attributes."""
+    __slots__ = ('panels', 'index')
+
+    def __init__(self, panels, index):
+        self.panels = panels
+        self.index = index
+
+
+def _array_property(name):
+    def get(self):
+        return float(getattr(self.panels, name)[self.index])
+
+    def set(self, value):
+        getattr(self.panels, name)[self.index] = value
+    return property(get, set)
+
+
+for _name in PanelSet.fields:
+    setattr(PanelView, _name, _array_property(_name))
+
+
+def as_panel_set(panels):
+    """Returns the panels as a PanelSet, converting Panel objects if needed."""
+    if isinstance(panels, PanelSet):
+        return panels
+    return PanelSet.from_panels(panels)
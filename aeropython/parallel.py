@@ -0,0 +1,66 @@
+import os
+import threading
+
+
+# environment variable giving the default number of threads
+NUM_THREADS_ENV = 'AEROPYTHON_NUM_THREADS'
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def num_threads(workers=None):
+    """Returns the number of threads to use.
+
+    Arguments
+    ---------
+    workers -- requested number of threads; by default the value of the
+               AEROPYTHON_NUM_THREADS environment variable, or the number
+               of processors.
+    """
+    if workers is None:
+        workers = os.environ.get(NUM_THREADS_ENV) or os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def _executor(workers):
+    # one pool per thread count, kept for the next calls; concurrent.futures
+    # is only imported when a pool is needed (it costs more than the rest
+    # of the package to import)
+    import concurrent.futures
+    with _lock:
+        if workers not in _executors:
+            _executors[workers] = concurrent.futures.ThreadPoolExecutor(
+                workers, thread_name_prefix='aeropython')
+        return _executors[workers]
+
+
+def map_tiles(function, size, tile_size, workers=None):
+    """Calls function(tile) on the tiles of range(size), on a thread pool.
+
+    The tiles are the slices [0, tile_size), [tile_size, 2*tile_size)...
+    whatever the number of threads, and the function is expected to write
+    its results into the slice tile of preallocated outputs: every value is
+    then computed by the same operations, so the results do not depend on
+    the number of threads. The NumPy kernels release the GIL, so the tiles
+    run concurrently.
+
+    Arguments
+    ---------
+    function -- function of a slice, writing into disjoint outputs.
+    size -- number of items (targets, rows...) to process.
+    tile_size -- number of items per tile.
+    workers -- number of threads (see num_threads).
+    """
+    tile_size = max(1, int(tile_size))
+    tiles = [slice(start, min(start+tile_size, size))
+             for start in range(0, size, tile_size)]
+    workers = min(num_threads(workers), len(tiles))
+    if workers <= 1:
+        for tile in tiles:
+            function(tile)
+        return
+    # result() raises the exception of a failed tile
+    for future in [_executor(workers).submit(function, tile)
+                   for tile in tiles]:
+        future.result()
@@ -0,0 +1,445 @@
+import numpy as np
+
+from .influence import panel_velocity
+from .kernels import numba_kernels
+from .multipole import SingularityTree
+from .panels import as_panel_set
+from .parallel import map_tiles
+from .profiling import count, profiled
+from .solver import PanelSolver
+
+
+class Particule:
+    def __init__(self,x=10000.,y=10000.,omega=0.,t=0.):
+        self.x = x
+        self.y = y
+        self.omega = omega
+        self.t = t
+    def influence(self,x,y):
+        d = np.sqrt((self.x-x)**2.+(self.y-y)**2.)
+        vec = [x-self.x, y-self.y]
+        if d ==0.:
+            F=[0.,0.]
+        else :
+            fac = self.omega / (2 * np.pi *d**2.)
+            F =  [-vec[1]*fac,vec[0]*fac]
+        return F
+
+
+def particuleVelocity(part,x,y):
+    u, v = 0., 0.
+    for p in part:
+        F = p.influence(x,y)
+        u, v = u+F[0], v+F[1]
+    return [u, v]
+
+
+class ParticleSystem:
+    """Cloud of vortex particles (discrete vortex blobs).
+
+    Positions and circulations are held in contiguous arrays, with spare
+    capacity so that particles can be added every step without copying
+    the whole cloud. The circulation is positive counterclockwise, as
+    Particule.omega, and the particles are Lamb-Oseen vortices of core
+    radius `core`: the singular 1/r kernel of a point vortex is smoothed
+    by 1 - exp(-r**2/core**2), so that close particles do not throw each
+    other away.
+
+    The velocities are summed over all pairs (method='direct'), or with a
+    BlobTree (method='tree') kept from one evaluation to the next, which
+    costs O(N log N) for large clouds.
+    """
+    def __init__(self, x=(), y=(), gamma=(), core=0.05, method='direct',
+                 theta=0.5, workers=None):
+        """Initializes the cloud.
+
+        Arguments
+        ---------
+        x, y -- coordinates of the particles.
+        gamma -- circulation of the particles (counterclockwise).
+        core -- core radius of the particles.
+        method -- velocity evaluation, 'direct' or 'tree'.
+        theta -- opening ratio of the tree; smaller is more accurate.
+        workers -- number of threads of the direct sums (see
+                   parallel.num_threads).
+        """
+        if method not in ('direct', 'tree'):
+            raise ValueError('unknown method: {}'.format(method))
+        self.core = core
+        self.method = method
+        self.theta = theta
+        self.workers = workers
+        self.tree = None
+        self.size = 0
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._gamma = np.empty(0)
+        self.add(x, y, gamma)
+
+    @classmethod
+    def from_particules(cls, particules, core=0.05):
+        """Builds the arrays from a sequence of Particule objects."""
+        return cls([p.x for p in particules], [p.y for p in particules],
+                   [p.omega for p in particules], core)
+
+    @property
+    def x(self):
+        return self._x[:self.size]
+
+    @property
+    def y(self):
+        return self._y[:self.size]
+
+    @property
+    def gamma(self):
+        return self._gamma[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def add(self, x, y, gamma):
+        """Appends particles to the cloud."""
+        x, y, gamma = np.broadcast_arrays(np.atleast_1d(np.asarray(x, float)),
+                                          np.atleast_1d(np.asarray(y, float)),
+                                          np.atleast_1d(np.asarray(gamma, float)))
+        size = self.size + x.size
+        if size > self._x.size:
+            # the capacity is doubled, so that appending is amortized O(1)
+            capacity = max(size, 2*self._x.size, 64)
+            for name in ('_x', '_y', '_gamma'):
+                array = np.empty(capacity)
+                array[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, array)
+        self._x[self.size:size] = x
+        self._y[self.size:size] = y
+        self._gamma[self.size:size] = gamma
+        self.size = size
+
+    @profiled()
+    def velocity(self, x, y, block_size=None):
+        """Returns the velocity induced by the particles at some points.
+
+        The N_points x N_particles interactions are computed by blocks of
+        points, on a thread pool, so that the temporary arrays of a thread
+        never hold more than block_size*N_particles values.
+
+        Parameters
+        ----------
+        x, y: Numpy array (float)
+            Coordinates of the points, of any (broadcastable) shape.
+        block_size: integer, optional
+            Number of points evaluated at once; by default about 2**18
+            values per temporary array.
+
+        Returns
+        -------
+        u, v: Numpy arrays (float)
+            Induced velocity components, with the shape of the points.
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float),
+                                   np.asarray(y, dtype=float))
+        shape = x.shape
+        x, y = x.ravel(), y.ravel()
+        u, v = np.zeros(x.size), np.zeros(x.size)
+        if self.size and self.method == 'tree':
+            if self.tree is None:
+                self.tree = BlobTree(self.x, self.y, self.gamma, self.core)
+            else:
+                self.tree.update(self.x, self.y, self.gamma)
+            u, v = self.tree.velocity(x, y, self.theta)
+        elif self.size and numba_kernels(self.workers) is not None:
+            jit = numba_kernels(self.workers)
+            count('blob_point_pairs', x.size*self.size)
+            jit.blob_velocity(np.ascontiguousarray(x), np.ascontiguousarray(y),
+                              self.x, self.y, self.gamma, self.core, u, v)
+        elif self.size:
+            if block_size is None:
+                block_size = max(1, 2**18//self.size)
+
+            def block_velocity(block):
+                u[block], v[block] = blob_velocity(x[block], y[block], self.x,
+                                                   self.y, self.gamma,
+                                                   self.core)
+
+            map_tiles(block_velocity, x.size, block_size, self.workers)
+        return u.reshape(shape), v.reshape(shape)
+
+    @profiled()
+    def advance(self, dt, onset=None, scheme='rk2'):
+        """Moves the particles with the local velocity over one time step.
+
+        Arguments
+        ---------
+        dt -- time step.
+        onset -- function onset(x, y) returning the velocity (u, v) that
+                 is not induced by the particles (freestream, bodies...).
+        scheme -- time integration, 'euler', 'rk2' (midpoint) or 'rk4'.
+        """
+        if scheme not in ('euler', 'rk2', 'rk4'):
+            raise ValueError('unknown scheme: {}'.format(scheme))
+        x0, y0 = self.x.copy(), self.y.copy()
+
+        def rate(x, y):
+            # positions of the particles moved to (x, y) for a stage
+            self.x[:], self.y[:] = x, y
+            u, v = self.velocity(x, y)
+            if onset is not None:
+                u_onset, v_onset = onset(x, y)
+                u, v = u + u_onset, v + v_onset
+            return u, v
+
+        u1, v1 = rate(x0, y0)
+        if scheme == 'euler':
+            dx, dy = u1, v1
+        elif scheme == 'rk2':
+            dx, dy = rate(x0 + 0.5*dt*u1, y0 + 0.5*dt*v1)
+        else:
+            u2, v2 = rate(x0 + 0.5*dt*u1, y0 + 0.5*dt*v1)
+            u3, v3 = rate(x0 + 0.5*dt*u2, y0 + 0.5*dt*v2)
+            u4, v4 = rate(x0 + dt*u3, y0 + dt*v3)
+            dx = (u1 + 2.*u2 + 2.*u3 + u4)/6.
+            dy = (v1 + 2.*v2 + 2.*v3 + v4)/6.
+        self.x[:] = x0 + dt*dx
+        self.y[:] = y0 + dt*dy
+
+
+def blob_velocity(x, y, xp, yp, gamma, core):
+    """Returns the velocity induced at the points (x, y) by the Lamb-Oseen
+    vortices (xp, yp, gamma), all pairs at once.
+
+    Parameters
+    ----------
+    x, y: Numpy 1d arrays (float)
+        Coordinates of the points.
+    xp, yp, gamma: Numpy 1d arrays (float)
+        Positions and circulations (counterclockwise) of the vortices.
+    core: float
+        Core radius of the vortices.
+
+    Returns
+    -------
+    u, v: Numpy 1d arrays (float)
+        Velocity components at the points.
+    """
+    count('blob_point_pairs', x.size*xp.size)
+    dx = x[:, np.newaxis] - xp
+    dy = y[:, np.newaxis] - yp
+    r2 = dx*dx + dy*dy
+    # gamma*(1 - exp(-r2/core**2))/(2*pi*r2), zero on the vortex itself
+    factor = -np.expm1(-r2/core**2)
+    factor /= np.where(r2 > 0., r2, 1.)
+    factor *= 0.5/np.pi*gamma
+    return -(factor*dy).sum(axis=1), (factor*dx).sum(axis=1)
+
+
+class BlobTree(SingularityTree):
+    """Quadtree of Lamb-Oseen vortex particles.
+
+    The far field of a cell is the multipole expansion of point vortices,
+    which is only valid once the smoothing of the cores has vanished: a
+    cell is used through its expansion when it is seen under a ratio
+    radius/distance smaller than theta and when all its particles are
+    farther than cutoff core radii from the target (the smoothing is then
+    below exp(-cutoff**2)). The particles of the leaves that are opened are
+    summed with the regularized kernel.
+
+    Between time steps update() moves the particles in their cells
+    (refit); the tree is only rebuilt when the cells have grown too much
+    or when too many particles have been added since the last build.
+    """
+    def __init__(self, x, y, gamma, core, cutoff=5., leaf_size=64, order=16,
+                 max_depth=32, rebuild_ratio=2.):
+        """Builds the tree of the particles.
+
+        Arguments
+        ---------
+        x, y, gamma -- positions and circulations (counterclockwise).
+        core -- core radius of the particles.
+        cutoff -- distance, in core radii, beyond which the kernel is
+                  taken as the one of a point vortex.
+        leaf_size, order, max_depth -- see SingularityTree.
+        rebuild_ratio -- growth of the cell radii triggering a rebuild.
+        """
+        self.core = core
+        self.cutoff = cutoff*core
+        self.rebuild_ratio = rebuild_ratio
+        self.gamma = np.array(gamma, dtype=float)
+        SingularityTree.__init__(self, x, y, _vortex_coefficients(gamma),
+                                 np.zeros(len(self.gamma)), leaf_size, order,
+                                 max_depth)
+
+    def build(self):
+        SingularityTree.build(self)
+        # particles added after the build, summed directly
+        self.new = slice(self.x.size, self.x.size)
+        self.x_new = self.y_new = self.gamma_new = np.empty(0)
+        # radii at build time, to detect the degradation of the cells
+        self.built_radius = np.maximum(self.radius, self.core)
+
+    def update(self, x, y, gamma):
+        """Moves the particles to (x, y) with circulations gamma.
+
+        The arrays may hold new particles after those of the tree.
+        """
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        gamma = np.asarray(gamma, dtype=float)
+        n = self.gamma.size
+        if x.size < n or x.size - n > self.leaf_size:
+            self._rebuild(x, y, gamma)
+            return
+        self.gamma[:] = gamma[:n]
+        self.refit(x[:n], y[:n], _vortex_coefficients(gamma[:n]))
+        if np.any(self.radius > self.rebuild_ratio*self.built_radius):
+            self._rebuild(x, y, gamma)
+            return
+        self.x_new, self.y_new = x[n:].copy(), y[n:].copy()
+        self.gamma_new = gamma[n:].copy()
+
+    def _rebuild(self, x, y, gamma):
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+        self.gamma = np.array(gamma, dtype=float)
+        self.a = _vortex_coefficients(self.gamma)
+        self.b = np.zeros(self.a.size, dtype=complex)
+        self.build()
+
+    def velocity(self, x, y, theta=0.5):
+        """Returns the velocity (u, v) induced by the particles at the
+        points (x, y), Numpy 1d arrays (float)."""
+        w, _ = self.evaluate(x, y, theta, stream=False)
+        u, v = w.real, -w.imag
+        if self.gamma_new.size:
+            u_new, v_new = blob_velocity(x, y, self.x_new, self.y_new,
+                                         self.gamma_new, self.core)
+            u += u_new
+            v += v_new
+        return u, v
+
+    def _accept(self, node, dz, theta):
+        distance = np.abs(dz)
+        return ((distance*theta > self.radius[node])
+                & (distance - self.radius[node] > self.cutoff))
+
+    def _near_field(self, node, targets, z, w, F, jit):
+        idx = self.index[self.start[node]:self.stop[node]]
+        if jit is None:
+            u, v = blob_velocity(z[targets].real, z[targets].imag,
+                                 self.x[idx], self.y[idx], self.gamma[idx],
+                                 self.core)
+        else:
+            count('blob_point_pairs', targets.size*idx.size)
+            u, v = np.empty(targets.size), np.empty(targets.size)
+            jit.blob_velocity(z[targets].real.copy(), z[targets].imag.copy(),
+                              self.x[idx], self.y[idx], self.gamma[idx],
+                              self.core, u, v)
+        w[targets] += u - 1j*v
+
+
+def _vortex_coefficients(gamma):
+    # a counterclockwise vortex adds -i*gamma/(2*pi)*log(z-z0) to F
+    return -1j*np.asarray(gamma, dtype=float)/(2*np.pi)
+
+
+class WakeSolver:
+    """Unsteady source-vortex panel body shedding a vortex particle wake.
+
+    Each step releases near the trailing edge a particle carrying the
+    change of bound circulation, so that the total circulation stays zero
+    (Kelvin's theorem), solves the panel system with the velocity induced
+    by the wake (new particle included) added to the freestream, and
+    finally convects the wake with the freestream, the body and the
+    particles themselves.
+
+    The body starts impulsively from rest: the first particle carries the
+    starting vortex.
+    """
+    def __init__(self, panels, Vinf=1.0, alpha=0., dt=0.05, core=None,
+                 scheme='rk2', shed_distance=0.5):
+        """Sets up the body and an empty wake.
+
+        Arguments
+        ---------
+        panels -- PanelSet or array of panels, closed at the trailing edge
+                  (first end-point of the first panel).
+        Vinf -- freestream speed.
+        alpha -- angle of attack in degrees.
+        dt -- time step.
+        core -- core radius of the particles, Vinf*dt by default.
+        scheme -- time integration of the wake (see ParticleSystem.advance).
+        shed_distance -- distance of the released particles downstream of
+                         the trailing edge, as a fraction of Vinf*dt.
+        """
+        self.panels = as_panel_set(panels)
+        self.solver = PanelSolver.for_geometry(self.panels)
+        self.u_inf = Vinf*np.cos(np.radians(alpha))
+        self.v_inf = Vinf*np.sin(np.radians(alpha))
+        self.dt = dt
+        self.scheme = scheme
+        self.wake = ParticleSystem(core=Vinf*dt if core is None else core)
+        self.time = 0.
+        self.circulation = []           # bound circulation at each step
+        self.x_shed = self.panels.xa[0] + shed_distance*dt*self.u_inf
+        self.y_shed = self.panels.ya[0] + shed_distance*dt*self.v_inf
+
+    def onset(self, x, y):
+        """Velocity of the freestream and of the wake at some points."""
+        u, v = self.wake.velocity(x, y)
+        return u + self.u_inf, v + self.v_inf
+
+    def body_velocity(self, x, y):
+        """Velocity of the freestream and of the panels at some points."""
+        u, v = panel_velocity(self.panels, x, y)
+        return u + self.u_inf, v + self.v_inf
+
+    def velocity(self, x, y):
+        """Total velocity (freestream, panels and wake) at some points."""
+        u, v = self.body_velocity(x, y)
+        u_wake, v_wake = self.wake.velocity(x, y)
+        return u + u_wake, v + v_wake
+
+    @profiled()
+    def step(self):
+        """Advances the body and its wake by one time step.
+
+        Returns
+        -------
+        sigma, gamma -- source strengths and vortex strength of the panels.
+        """
+        panels = self.panels
+        total_length = panels.length.sum()
+        # the shed particle carries -gamma_old - bound = -gamma_old +
+        # gamma*L and acts on the panels within the same step: the system
+        # is linear in gamma, so it is solved for the known part of the
+        # onset flow and for the part per unit of gamma
+        shed_old = -self.wake.gamma.sum()
+        u, v = self.onset(panels.xc, panels.yc)
+        u_shed, v_shed = blob_velocity(panels.xc, panels.yc,
+                                       np.array([self.x_shed]),
+                                       np.array([self.y_shed]),
+                                       np.ones(1), self.wake.core)
+        sigma_0, gamma_0 = self.solver.solve_onset(u + shed_old*u_shed,
+                                                   v + shed_old*v_shed)
+        sigma_1, gamma_1 = self.solver.solve_onset(total_length*u_shed,
+                                                   total_length*v_shed)
+        gamma = gamma_0/(1. - gamma_1)
+        sigma = sigma_0 + gamma*sigma_1
+        panels.sigma[:] = sigma
+        panels.gamma[:] = gamma
+        # gamma is clockwise, the particles are counterclockwise
+        bound = -gamma*total_length
+        self.wake.add(self.x_shed, self.y_shed, shed_old - bound)
+        self.circulation.append(bound)
+        self.wake.advance(self.dt, self._convection, self.scheme)
+        self.time += self.dt
+        return sigma, gamma
+
+    def _convection(self, x, y):
+        # the wake is moved by the body with its strengths of this step
+        return self.body_velocity(x, y)
+
+    def run(self, steps, callback=None):
+        """Runs steps time steps, calling callback(self) after each one."""
+        for _ in range(steps):
+            self.step()
+            if callback is not None:
+                callback(self)
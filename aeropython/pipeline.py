@@ -0,0 +1,99 @@
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+
+from .profiling import profiled
+
+
+@profiled()
+def render_frame(path, X, Y, u, v, x_ends, y_ends, xlim, ylim):
+    """Draws the streamlines of a velocity field around a body into a PNG."""
+    # imported in the worker; no window is ever opened
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+    from .plotting import plot_streamlines
+    fig = plt.figure()
+    plot_streamlines(X, Y, u, v, fig.gca(), x_ends, y_ends, xlim, ylim)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+class FramePipeline:
+    """Hands the snapshots of a time-stepping solver to background workers.
+
+    With render=True each snapshot is drawn and saved as <prefix><it>.png
+    by a pool of processes (matplotlib is not thread-safe). With a writer
+    (an output.FieldWriter), its arrays are appended to the store by a
+    single thread, which keeps the steps in order (zlib and the file
+    writes release the GIL). At most max_pending jobs wait in the queue:
+    submit() blocks when it is full, so memory stays bounded when the
+    workers are slower than the solver. The arrays handed to submit()
+    must not be modified afterwards.
+    """
+    def __init__(self, render=True, workers=2, max_pending=4, directory='.',
+                 prefix='img_', writer=None):
+        self.render = render
+        self.directory = directory
+        self.prefix = prefix
+        self.writer = writer
+        self.executor = None
+        self._store = None
+        if render:
+            # fresh interpreters: the solver process may use an
+            # interactive matplotlib backend
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context('spawn'))
+        if writer is not None:
+            self._store = concurrent.futures.ThreadPoolExecutor(1)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+
+    @profiled()
+    def submit(self, it, X, Y, u, v, x_ends, y_ends, xlim, ylim, **extra):
+        """Queues the snapshot of iteration it, waiting for free slots.
+
+        The velocity and the extra arrays (panel strengths, cp...) are
+        appended to the store of the writer; the extra arrays are not
+        drawn.
+        """
+        if self.render:
+            name = os.path.join(self.directory, self.prefix + str(it))
+            self._queue(self.executor, render_frame, name + '.png', X, Y, u,
+                        v, x_ends, y_ends, xlim, ylim)
+        if self.writer is not None:
+            self._queue(self._store, self.writer.append, u=u, v=v, **extra)
+        # errors of finished jobs are raised as early as possible
+        while self._futures and self._futures[0].done():
+            self._futures.pop(0).result()
+
+    def _queue(self, executor, function, *args, **kwargs):
+        self._slots.acquire()
+        try:
+            future = executor.submit(function, *args, **kwargs)
+        except BaseException:
+            # no job to release the slot (broken or shut down pool)
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        self._futures.append(future)
+
+    def close(self):
+        """Waits for the pending snapshots and stops the workers."""
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._futures = []
+            for executor in (self.executor, self._store):
+                if executor is not None:
+                    executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
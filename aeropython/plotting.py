@@ -0,0 +1,77 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+from .profiling import profiled
+
+
+# this module is the only one importing matplotlib; it is not imported by
+# the package until aeropython.plotting is used
+
+
+@profiled()
+def plot_streamlines(X, Y, u, v, ax=None, x_ends=None, y_ends=None, xlim=None,
+                     ylim=None, density=2, arrowsize=1):
+    """Draws the streamlines of a velocity field, and the panel end-points
+    of a body if given.
+
+    Arguments
+    ---------
+    X, Y -- mesh grid.
+    u, v -- velocity field on the grid.
+    ax -- matplotlib axes, the current ones by default.
+    x_ends, y_ends -- end-points of the panels of a body.
+    xlim, ylim -- limits of the plot.
+    density, arrowsize -- options of the streamplot.
+    """
+    ax = ax or plt.gca()
+    ax.streamplot(X, Y, u, v, density=density, linewidth=1,
+                  arrowsize=arrowsize, arrowstyle='->')
+    if x_ends is not None:
+        ax.plot(x_ends, y_ends, 'rs', linewidth=1)
+    if xlim is not None:
+        ax.set_xlim(*xlim)
+    if ylim is not None:
+        ax.set_ylim(*ylim)
+    return ax
+
+
+def plot_panels(panels, ax=None, radius=None):
+    """Draws the panels of a body with their end-points and center-points,
+    and the circle they discretize if a radius is given."""
+    ax = ax or plt.gca()
+    ax.grid(True)
+    ax.set_xlabel('x', fontsize=16)
+    ax.set_ylabel('y', fontsize=16)
+    legend = []
+    if radius is not None:
+        theta = np.linspace(0, 2*np.pi, 100)
+        ax.plot(radius*np.cos(theta), radius*np.sin(theta), color='b',
+                linestyle='-', linewidth=1)
+        legend.append('cylinder')
+    ax.plot(panels.x_ends, panels.y_ends, color='#CD2305', linestyle='-',
+            linewidth=2)
+    ax.scatter(panels.xa, panels.ya, color='#CD2305', s=40)
+    ax.scatter(panels.xc, panels.yc, color='k', s=40, zorder=3)
+    ax.legend(legend + ['panels', 'end-points', 'center-points'], loc='best',
+              prop={'size': 16})
+    return ax
+
+
+def plot_cp(panels, ax=None):
+    """Draws the pressure coefficient of the panels along x (negative up)."""
+    ax = ax or plt.gca()
+    ax.grid(True)
+    ax.set_xlabel('x', fontsize=16)
+    ax.set_ylabel('$C_p$', fontsize=16)
+    ax.plot(panels.xc, panels.cp, color='#CD2305', linestyle='-', marker='o')
+    ax.invert_yaxis()
+    return ax
+
+
+def plot_incidence(theta, incid, ax=None):
+    """Draws the incidence of a rotor blade (degrees) over a revolution."""
+    ax = ax or plt.gca()
+    ax.plot(theta, incid)
+    ax.set_xlabel('azimuth', fontsize=16)
+    ax.set_ylabel('incidence', fontsize=16)
+    return ax
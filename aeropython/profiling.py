@@ -0,0 +1,273 @@
+"""Opt-in instrumentation of the solver stages.
+
+The solver functions are wrapped in named stages and report the number of
+kernel evaluations they do (panel/point pairs, singularity/point pairs,
+quadratures...). Nothing is collected until a profiler is enabled; until
+then a stage costs one test of a global variable.
+
+    from aeropython import profiling
+    with profiling.profile(memory=True) as profiler:
+        polar('NACAcamber0012.dat', alphas)
+    profiler.report()                         # dict of the stages
+    profiler.write_json('profile.json')
+    profiler.write_chrome_trace('trace.json') # chrome://tracing, Perfetto
+
+With memory=True, the peak of the memory allocated during each stage,
+NumPy arrays included, is measured with tracemalloc; this slows the
+allocations down, so the times are then less representative. The memory
+is counted over all the threads, the times and the counts per thread.
+"""
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+# active profiler, None when profiling is disabled
+_profiler = None
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    """Running stage of a thread."""
+    __slots__ = ('name', 'start', 'memory_start', 'memory_peak', 'children',
+                 'counts')
+
+    def __init__(self, name, start, memory_start):
+        self.name = name
+        self.start = start
+        self.memory_start = memory_start
+        self.memory_peak = memory_start
+        self.children = 0.
+        self.counts = collections.Counter()
+
+
+class _StageContext:
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter(self.name)
+
+    def __exit__(self, *exc_info):
+        self.profiler._exit()
+
+
+class Profiler:
+    """Collects the stages, counters and memory peaks of a run.
+
+    Arguments
+    ---------
+    memory -- measure the peak memory of the stages with tracemalloc.
+    """
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.origin = time.perf_counter()
+        self.events = []
+        self.counters = collections.Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # whether tracemalloc was started for this profiler
+        self._tracemalloc = False
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _memory(self, stack):
+        # current memory, after folding the peak so far into the running
+        # stages, the peak being reset for the new interval
+        if not self.memory:
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for running in stack:
+            running.memory_peak = max(running.memory_peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _enter(self, name):
+        stack = self._stack()
+        memory = self._memory(stack)
+        stack.append(_Stage(name, time.perf_counter(), memory))
+
+    def _exit(self):
+        end = time.perf_counter()
+        stack = self._stack()
+        self._memory(stack)
+        running = stack.pop()
+        duration = end - running.start
+        if stack:
+            stack[-1].children += duration
+        event = {'name': running.name, 'thread': threading.get_ident(),
+                 'depth': len(stack), 'start': running.start - self.origin,
+                 'duration': duration, 'self': duration - running.children,
+                 'memory': running.memory_peak - running.memory_start,
+                 'counts': dict(running.counts)}
+        with self._lock:
+            self.events.append(event)
+
+    def stage(self, name):
+        """Returns a context manager timing a stage."""
+        return _StageContext(self, name)
+
+    def count(self, name, n=1):
+        """Adds n to a counter, for the run and the innermost stage."""
+        with self._lock:
+            self.counters[name] += n
+        stack = self._stack()
+        if stack:
+            stack[-1].counts[name] += n
+
+    def report(self):
+        """Returns the stages aggregated by name.
+
+        Returns
+        -------
+        report: dict
+            'wall': time since the profiler was enabled; 'counters': total
+            of each counter; 'stages': for each stage name, the number of
+            'calls', the 'total', 'self' (without the sub-stages), 'mean'
+            and 'max' times in seconds, the 'memory' peak in bytes above
+            the memory at the start of the stage (0 without memory
+            profiling), and the 'counts' of the kernel evaluations done
+            directly in the stage.
+        """
+        stages = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            stage = stages.setdefault(event['name'], {
+                'calls': 0, 'total': 0., 'self': 0., 'max': 0., 'memory': 0,
+                'counts': collections.Counter()})
+            stage['calls'] += 1
+            stage['total'] += event['duration']
+            stage['self'] += event['self']
+            stage['max'] = max(stage['max'], event['duration'])
+            stage['memory'] = max(stage['memory'], event['memory'])
+            stage['counts'].update(event['counts'])
+        for stage in stages.values():
+            stage['mean'] = stage['total']/stage['calls']
+            stage['counts'] = dict(stage['counts'])
+        return {'wall': time.perf_counter() - self.origin,
+                'memory_profiling': self.memory,
+                'counters': dict(self.counters),
+                'stages': dict(sorted(stages.items(),
+                                      key=lambda item: -item[1]['total']))}
+
+    def format(self):
+        """Returns the report as a text table, slowest stages first."""
+        report = self.report()
+        lines = ['{:<28s} {:>6s} {:>10s} {:>10s} {:>12s}'.format(
+            'stage', 'calls', 'total s', 'self s', 'memory MB')]
+        for name, stage in report['stages'].items():
+            lines.append('{:<28s} {:6d} {:10.4f} {:10.4f} {:12.2f}'.format(
+                name, stage['calls'], stage['total'], stage['self'],
+                stage['memory']/2**20))
+        for name, value in sorted(report['counters'].items()):
+            lines.append('{:<28s} {:>6s} {:g}'.format(name, '', value))
+        return '\n'.join(lines)
+
+    def write_json(self, path):
+        """Writes the report (see report) with the list of the stage
+        events."""
+        report = self.report()
+        with self._lock:
+            report['events'] = list(self.events)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    def write_chrome_trace(self, path):
+        """Writes the stages in the Trace Event Format of chrome://tracing
+        and Perfetto, with the memory and the counts as arguments."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        trace = [{'name': event['name'], 'ph': 'X', 'pid': pid,
+                  'tid': event['thread'], 'ts': 1e6*event['start'],
+                  'dur': 1e6*event['duration'],
+                  'args': dict(event['counts'], memory=event['memory'])}
+                 for event in events]
+        end = max([e['start'] + e['duration'] for e in events] + [0.])
+        trace += [{'name': name, 'ph': 'C', 'pid': pid, 'ts': 1e6*end,
+                   'args': {name: value}} for name, value in counters.items()]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+
+def enable(memory=False):
+    """Starts collecting into a new profiler, which is returned."""
+    global _profiler
+    disable()
+    profiler = Profiler(memory)
+    if memory:
+        # tracemalloc is stopped by disable() only if started here
+        profiler._tracemalloc = not tracemalloc.is_tracing()
+        if profiler._tracemalloc:
+            tracemalloc.start()
+    _profiler = profiler
+    return profiler
+
+
+def disable():
+    """Stops collecting; returns the profiler that was active, or None."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None and profiler._tracemalloc:
+        tracemalloc.stop()
+    return profiler
+
+
+def active():
+    """Returns the active profiler, or None."""
+    return _profiler
+
+
+@contextlib.contextmanager
+def profile(memory=False):
+    """Context manager enabling a profiler for the enclosed code."""
+    profiler = enable(memory)
+    try:
+        yield profiler
+    finally:
+        disable()
+
+
+def stage(name):
+    """Returns a context manager timing the enclosed code as a stage of the
+    active profiler (doing nothing when profiling is disabled)."""
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name)
+
+
+def count(name, n=1):
+    """Adds n to a counter of the active profiler, if any."""
+    if _profiler is not None:
+        _profiler.count(name, n)
+
+
+def profiled(name=None):
+    """Decorator running a function as a stage, named after the function
+    (with its class for a method) by default."""
+    def decorate(function):
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return function(*args, **kwargs)
+            with _profiler.stage(label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,252 @@
+import concurrent.futures
+
+import numpy as np
+
+
+class pointPale:
+    """Position of the blade at radius r and azimuth teta."""
+    def __init__(self,r,teta):
+        self.x=r*np.cos(teta)
+        self.y=r*np.sin(teta)
+
+
+def azimuths(n_azimuth=40):
+    """Returns n_azimuth blade positions evenly spread over a revolution."""
+    return 2.*np.pi*np.arange(n_azimuth)/n_azimuth
+
+
+def relative_velocity(theta, r0, omega, gamma=(), x=(), y=(), Vinf=1.5,
+                      alpha=0.):
+    """Returns the velocity seen by the blade of a Darrieus rotor.
+
+    The rotor parameters broadcast against each other to a shape of
+    configurations C, and the azimuths are added as a last axis. The
+    vortices of a configuration are given along the last axis of gamma,
+    x and y (shape C + (N_vortices,), or (N_vortices,) for all the
+    configurations).
+
+    Parameters
+    ----------
+    theta: Numpy 1d array (float)
+        Azimuths of the blade in radians.
+    r0, omega: float or Numpy array (float)
+        Radius and angular speed of the rotor.
+    gamma, x, y: Numpy arrays (float)
+        Strengths (clockwise, as singularities.vortex) and positions of the
+        vortices.
+    Vinf: float or Numpy array (float)
+        Freestream speed.
+    alpha: float or Numpy array (float)
+        Freestream direction in degrees.
+
+    Returns
+    -------
+    u_rel, v_rel: Numpy arrays (float)
+        Velocity of the flow relative to the blade, shape C + (N_theta,).
+    u_blade, v_blade: Numpy arrays (float)
+        Velocity of the blade, shape C + (N_theta,).
+    """
+    theta = np.asarray(theta, dtype=float)
+    r0 = np.asarray(r0, dtype=float)[..., np.newaxis]
+    omega = np.asarray(omega, dtype=float)[..., np.newaxis]
+    alpha = np.radians(np.asarray(alpha, dtype=float))[..., np.newaxis]
+    Vinf = np.asarray(Vinf, dtype=float)[..., np.newaxis]
+    # the azimuths get their own axis before the one of the vortices
+    gamma = np.asarray(gamma, dtype=float)[..., np.newaxis, :]
+    x = np.asarray(x, dtype=float)[..., np.newaxis, :]
+    y = np.asarray(y, dtype=float)[..., np.newaxis, :]
+
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    u_blade, v_blade = -r0*omega*sin_t, r0*omega*cos_t
+    # velocity induced by all the vortices at the blade positions
+    dx = (r0*cos_t)[..., np.newaxis] - x
+    dy = (r0*sin_t)[..., np.newaxis] - y
+    k = gamma/(2*np.pi)/(dx*dx + dy*dy)
+    u = Vinf*np.cos(alpha) + (k*dy).sum(axis=-1)
+    v = Vinf*np.sin(alpha) - (k*dx).sum(axis=-1)
+    return u - u_blade, v - v_blade, u_blade, v_blade
+
+
+def incidence(theta, r0, omega, gamma=(), x=(), y=(), Vinf=1.5, alpha=0.):
+    """Returns the incidence of the blade in degrees, shape C + (N_theta,).
+
+    The arguments are those of relative_velocity; the incidence is the
+    angle between the relative velocity and the direction of motion of the
+    blade, in (-90, 90).
+    """
+    u_rel, v_rel, u_blade, v_blade = relative_velocity(theta, r0, omega, gamma,
+                                                       x, y, Vinf, alpha)
+    # the chord of the blade points against its motion
+    cos = -(u_rel*u_blade + v_rel*v_blade)
+    sin = -(u_rel*v_blade - v_rel*u_blade)
+    return np.degrees(np.arctan(sin/cos))
+
+
+def score(theta, incid, target):
+    """Returns the squared gap between the mean incidence on the downwind
+    half of the revolution (pi/2 <= theta <= 3*pi/2) and the target
+    incidence, shape C.
+
+    Arguments
+    ---------
+    theta -- azimuths in radians.
+    incid -- incidence in degrees, shape C + (N_theta,).
+    target -- target incidence in degrees, broadcast to C.
+    """
+    theta = np.asarray(theta, dtype=float)
+    downwind = (theta >= np.pi/2) & (theta <= 3*np.pi/2)
+    return (incid[..., downwind].mean(axis=-1) - target)**2
+
+
+def sweep(r0, omega, target, gamma=(), x=(), y=(), Vinf=1.5, alpha=0.,
+          n_azimuth=40):
+    """Evaluates a batch of rotor configurations in one array computation.
+
+    Parameters
+    ----------
+    r0, omega, target: float or Numpy arrays (float)
+        Radius, angular speed and target incidence (degrees), broadcast
+        to the shape C of the configurations.
+    gamma, x, y: Numpy arrays (float)
+        Vortices of the configurations (see relative_velocity).
+    Vinf, alpha: float or Numpy arrays (float)
+        Freestream speed and direction (degrees).
+    n_azimuth: integer
+        Number of blade positions over a revolution.
+
+    Returns
+    -------
+    theta: Numpy 1d array (float)
+        Azimuths in radians.
+    incid: Numpy array (float)
+        Incidence tables in degrees, shape C + (n_azimuth,).
+    scores: Numpy array (float)
+        Scores of the configurations, shape C.
+    """
+    theta = azimuths(n_azimuth)
+    incid = incidence(theta, r0, omega, gamma, x, y, Vinf, alpha)
+    return theta, incid, score(theta, incid, target)
+
+
+class RotorObjective:
+    """Score of rotor configurations coded as parameter vectors.
+
+    A vector holds the angular speed of the rotor followed by the strengths,
+    the x and the y positions of n_vortices vortices. The object is called
+    by scipy.optimize with one vector (shape (N,)) or a whole population
+    (shape (N, S)), which is scored in one array computation, split among
+    processes when processes > 1.
+    """
+    def __init__(self, n_vortices=2, r0=0.75, target=7.0, Vinf=1.5, alpha=0.,
+                 n_azimuth=40, processes=1):
+        self.n_vortices = n_vortices
+        self.r0 = r0
+        self.target = target
+        self.Vinf = Vinf
+        self.alpha = alpha
+        self.n_azimuth = n_azimuth
+        self.processes = processes
+        self.executor = None
+
+    def decode(self, p):
+        """Returns omega, gamma, x, y of parameter vectors p, shape (N, ...)."""
+        p = np.asarray(p, dtype=float)
+        n = self.n_vortices
+        # vortices on the last axis, configurations before
+        omega = p[0]
+        gamma, x, y = (np.moveaxis(p[1+i*n:1+(i+1)*n], 0, -1)
+                       for i in range(3))
+        return omega, gamma, x, y
+
+    def score(self, p):
+        """Scores of parameter vectors p, shape (N,) or (N, S)."""
+        omega, gamma, x, y = self.decode(p)
+        _, _, scores = sweep(self.r0, omega, self.target, gamma, x, y,
+                             self.Vinf, self.alpha, self.n_azimuth)
+        # vortices on the path of the blade give infinite incidences
+        return np.where(np.isfinite(scores), scores, 1e10)
+
+    def __call__(self, p):
+        p = np.asarray(p, dtype=float)
+        if self.processes <= 1 or p.ndim == 1 or p.shape[1] < 2*self.processes:
+            return self.score(p)
+        if self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                self.processes)
+        parts = np.array_split(p, self.processes, axis=1)
+        return np.concatenate(list(self.executor.map(self.score, parts)))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __getstate__(self):
+        # the pool stays in the parent process
+        state = self.__dict__.copy()
+        state['executor'] = None
+        return state
+
+
+def optimize(n_vortices=2, r0=0.75, target=7.0, omega_bounds=(0.5, 10.),
+             gamma_bounds=(-10., 10.), position_bounds=(-3., 3.), Vinf=1.5,
+             alpha=0., n_azimuth=40, processes=1, callback=None, **options):
+    """Finds the rotor speed and the vortices giving the target incidence.
+
+    The score of rotor.score is minimized by differential evolution, the
+    whole population of a generation being scored in one call.
+
+    Parameters
+    ----------
+    n_vortices: integer
+        Number of vortices placed around the rotor.
+    r0: float
+        Radius of the rotor.
+    target: float
+        Target incidence in degrees.
+    omega_bounds, gamma_bounds, position_bounds: tuples of 2 floats
+        Bounds of the angular speed, of the vortex strengths and of the
+        vortex coordinates.
+    Vinf, alpha: float
+        Freestream speed and direction (degrees).
+    n_azimuth: integer
+        Number of blade positions over a revolution.
+    processes: integer
+        Number of processes scoring the population.
+    callback: function, optional
+        Called as callback(generation, best_score, parameters) after each
+        generation; the optimization stops if it returns True.
+    options:
+        Other arguments of scipy.optimize.differential_evolution (maxiter,
+        popsize, tol, seed, polish...).
+
+    Returns
+    -------
+    result: scipy.optimize.OptimizeResult
+        Result of the optimization, with the best rotor in omega, gamma, x
+        and y, and in history the best score of every generation.
+    """
+    # imported here so that the sweep does not need scipy
+    from scipy.optimize import differential_evolution
+    objective = RotorObjective(n_vortices, r0, target, Vinf, alpha, n_azimuth,
+                               processes)
+    bounds = ([omega_bounds] + [gamma_bounds]*n_vortices
+              + [position_bounds]*(2*n_vortices))
+    history = []
+
+    def record(xk, convergence=None):
+        history.append(float(objective.score(xk)))
+        if callback is not None:
+            return callback(len(history), history[-1], xk)
+
+    try:
+        result = differential_evolution(objective, bounds, callback=record,
+                                        vectorized=True, updating='deferred',
+                                        **options)
+    finally:
+        objective.close()
+    result.history = np.array(history)
+    omega, result.gamma, result.x_vortices, result.y_vortices = \
+        objective.decode(result.x)
+    result.omega = float(omega)
+    return result
@@ -0,0 +1,234 @@
+import numpy as np
+
+from .parallel import map_tiles
+from .profiling import count, profiled
+
+
+class singularity:
+    """Base class of the point singularities.
+
+    evaluate() and accumulate() return or add the velocity, the stream
+    function and optionally the potential from a single computation of the
+    distances to the singularity; accumulate() works in place on buffers
+    given by the caller, so superposing many singularities does not
+    allocate full-grid arrays for every element.
+    """
+    def evaluate(self, X, Y, potential=False):
+        """Returns u, v, psi (and phi if potential is True) on the points."""
+        shape = np.broadcast(X, Y).shape
+        fields = [np.zeros(shape) for _ in range(4 if potential else 3)]
+        self.accumulate(X, Y, *fields)
+        return tuple(fields)
+
+    def accumulate(self, X, Y, u, v, psi=None, phi=None, work=None):
+        """Adds the velocity, stream function and potential to the buffers.
+
+        Arguments
+        ---------
+        X, Y -- mesh grid (or any array of points).
+        u, v -- velocity buffers, updated in place.
+        psi, phi -- stream function and potential buffers, or None.
+        work -- optional tuple of 4 arrays of the points shape, reused as
+                temporary storage.
+        """
+        if work is None:
+            work = tuple(np.empty(u.shape) for _ in range(4))
+        dx, dy, r2, tmp = work
+        np.subtract(X, self.x, out=dx)
+        np.subtract(Y, self.y, out=dy)
+        np.multiply(dx, dx, out=r2)
+        np.multiply(dy, dy, out=tmp)
+        r2 += tmp
+        self._accumulate(dx, dy, r2, tmp, u, v, psi, phi)
+
+
+class sourceSink(singularity):
+    def __init__(self,strength,x,y):
+        self.strength=strength
+        self.x=x
+        self.y=y
+
+    def get_velocity(self, X, Y):
+        """Returns the velocity field generated by a source/sink.
+
+        Arguments
+        ---------
+        X, Y -- mesh grid.
+        """
+        u = self.strength/(2*np.pi)*(X-self.x)/((X-self.x)**2+(Y-self.y)**2)
+        v = self.strength/(2*np.pi)*(Y-self.y)/((X-self.x)**2+(Y-self.y)**2)
+
+        return [u, v]
+
+    def get_stream_function(self, X, Y):
+        """Returns the stream-function generated by a source/sink.
+
+        Arguments
+        ---------
+        X, Y -- mesh grid.
+        """
+        psi = self.strength/(2*np.pi)*np.arctan2((Y-self.y), (X-self.x))
+
+        return psi
+
+    def _accumulate(self, dx, dy, r2, tmp, u, v, psi, phi):
+        k = self.strength/(2*np.pi)
+        if phi is not None:
+            np.log(r2, out=tmp)
+            tmp *= 0.5*k
+            phi += tmp
+        if psi is not None:
+            np.arctan2(dy, dx, out=tmp)
+            tmp *= k
+            psi += tmp
+        # r2 is no longer needed: k/r2
+        np.divide(k, r2, out=r2)
+        np.multiply(r2, dx, out=tmp)
+        u += tmp
+        np.multiply(r2, dy, out=tmp)
+        v += tmp
+
+
+class doublet(singularity):
+    def __init__(self,kappa,x,y):
+        self.kappa=kappa
+        self.x=x
+        self.y=y
+
+    def get_velocity(self,X,Y):
+        dx=X-self.x
+        dy=Y-self.y
+        u=-self.kappa/(2*np.pi)*(dx*dx-dy*dy)/(dx**2+dy**2)**2
+        v=-self.kappa/(np.pi)*dx*dy/(dx**2+dy**2)**2
+        return [u,v]
+
+    def get_stream_function(self,X,Y):
+        dx=X-self.x
+        dy=Y-self.y
+        psi=-self.kappa/(2*np.pi)*dy/(dx**2+dy**2)
+        return psi
+
+    def _accumulate(self, dx, dy, r2, tmp, u, v, psi, phi):
+        k = self.kappa/(2*np.pi)
+        # r2 is no longer needed: 1/r2
+        np.divide(1., r2, out=r2)
+        if phi is not None:
+            np.multiply(dx, r2, out=tmp)
+            tmp *= k
+            phi += tmp
+        if psi is not None:
+            np.multiply(dy, r2, out=tmp)
+            tmp *= k
+            psi -= tmp
+        # dx/r2, dy/r2, then (dx**2-dy**2)/r2**2 = (dx-dy)*(dx+dy)/r2**2
+        dx *= r2
+        dy *= r2
+        np.subtract(dx, dy, out=tmp)
+        np.add(dx, dy, out=r2)
+        tmp *= r2
+        tmp *= k
+        u -= tmp
+        np.multiply(dx, dy, out=tmp)
+        tmp *= 2.*k
+        v -= tmp
+
+
+class vortex(singularity):
+    def __init__(self,gamma,x,y):
+        self.gamma=gamma
+        self.x=x
+        self.y=y
+    def get_velocity(self,X,Y):
+        dx=X-self.x
+        dy=Y-self.y
+        u=self.gamma/(2*np.pi)*dy/(dx**2+dy**2)
+        v=-self.gamma/(2*np.pi)*dx/(dx**2+dy**2)
+        return [u,v]
+    def get_stream_function(self,X,Y):
+        dx=X-self.x
+        dy=Y-self.y
+        psi=self.gamma/(4*np.pi)*np.log(dx**2+dy**2)
+        return psi
+
+    def _accumulate(self, dx, dy, r2, tmp, u, v, psi, phi):
+        k = self.gamma/(2*np.pi)
+        if phi is not None:
+            np.arctan2(dy, dx, out=tmp)
+            tmp *= k
+            phi -= tmp
+        if psi is not None:
+            np.log(r2, out=tmp)
+            tmp *= 0.5*k
+            psi += tmp
+        # r2 is no longer needed: k/r2
+        np.divide(k, r2, out=r2)
+        np.multiply(r2, dy, out=tmp)
+        u += tmp
+        np.multiply(r2, dx, out=tmp)
+        v -= tmp
+
+
+class freeStream:
+    def __init__(self,Vinf=1.0,alpha=0.):
+        self.Vinf=Vinf
+        self.alpha=alpha*np.pi/180.
+        self.u=Vinf*np.cos(self.alpha)
+        self.v=Vinf*np.sin(self.alpha)
+
+    def accumulate(self, X, Y, u, v, psi=None, phi=None, work=None):
+        """Adds the uniform flow to the buffers (see singularity.accumulate)."""
+        u += self.u
+        v += self.v
+        if psi is not None:
+            psi += self.u*Y - self.v*X
+        if phi is not None:
+            phi += self.u*X + self.v*Y
+
+
+@profiled()
+def superpose(elements, X, Y, freestream=None, potential=False, workers=None,
+              tile_size=2**14):
+    """Returns the flow of a list of singularities on a mesh grid.
+
+    The points are split into tiles processed on a thread pool; for each
+    tile, the temporary arrays are allocated once and every element
+    accumulates into the output.
+
+    Parameters
+    ----------
+    elements: list of sourceSink, doublet or vortex objects
+        Singularities to superpose.
+    X, Y: Numpy arrays (float)
+        Mesh grid, or any array of points.
+    freestream: freeStream object, optional
+        Uniform flow added to the singularities.
+    potential: boolean
+        Whether the velocity potential is computed too.
+    workers: integer, optional
+        Number of threads (see parallel.num_threads).
+    tile_size: integer
+        Number of points per tile.
+
+    Returns
+    -------
+    u, v, psi (, phi): Numpy arrays (float)
+        Velocity components, stream function (and potential).
+    """
+    X, Y = np.broadcast_arrays(np.asarray(X, dtype=float),
+                               np.asarray(Y, dtype=float))
+    shape = X.shape
+    X, Y = X.ravel(), Y.ravel()
+    fields = [np.zeros(X.size) for _ in range(4 if potential else 3)]
+    count('singularity_point_pairs', len(elements)*X.size)
+
+    def tile(points):
+        n = points.stop - points.start
+        work = tuple(np.empty(n) for _ in range(4))
+        out = [f[points] for f in fields]
+        if freestream is not None:
+            freestream.accumulate(X[points], Y[points], *out)
+        for e in elements:
+            e.accumulate(X[points], Y[points], *out, work=work)
+
+    map_tiles(tile, X.size, tile_size, workers)
+    return tuple(f.reshape(shape) for f in fields)
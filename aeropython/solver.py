@@ -0,0 +1,587 @@
+import math
+
+import numpy as np
+
+from .airfoil import close_trailing_edge, load_airfoil, rotate
+from .cache import default_cache
+from .influence import (analytic_integral, influence_matrices, panel_arrays,
+                        panel_velocity, sheet_velocity)
+from .panels import PanelSet, as_panel_set
+from .profiling import count, profiled, stage
+
+# scipy is imported in the functions that use it, so that importing the
+# solver stays fast
+
+def read_profile(name, alp=0., cache_dir=None):
+    """Reads the contour of a profile from a Selig-style file.
+    
+    The first line is a title; the first and last points are replaced by
+    their middle so that the contour is closed at the trailing edge.
+    
+    Arguments
+    ---------
+    name -- path of the file.
+    alp -- rotation (radians) applied to the contour.
+    cache_dir -- binary cache of the parsed files (see airfoil.load_airfoil).
+    
+    Returns
+    -------
+    x_ends, y_ends -- coordinates of the panel end-points.
+    """
+    x, y = close_trailing_edge(*load_airfoil(name, cache_dir))
+    return rotate(x, y, alp)
+
+
+def kutta_condition(A_source, B_vortex):
+    """Builds the Kutta condition array.
+    
+    Parameters
+    ----------
+    A_source: Numpy 2d array (float)
+        Source contribution matrix for the normal velocity.
+    B_vortex: Numpy 2d array (float)
+        Vortex contribution matrix for the normal velocity.
+    
+    Returns
+    -------
+    b: Numpy 1d array (float)
+        The left hand-side of the Kutta-condition equation.
+    """
+    b = np.empty(A_source.shape[0]+1, dtype=float)
+    # matrix of source contribution on tangential velocity
+    # is the same than
+    # matrix of vortex contribution on normal velocity
+    b[:-1] = B_vortex[0, :] + B_vortex[-1, :]
+    # matrix of vortex contribution on tangential velocity
+    # is the opposite of
+    # matrix of source contribution on normal velocity
+    b[-1] = - np.sum(A_source[0, :] + A_source[-1, :])
+    return b
+
+
+def build_singularity_matrix(A_source, B_vortex):
+    """Builds the left hand-side matrix of the system
+    arising from source and vortex contributions.
+    
+    Parameters
+    ----------
+    A_source: Numpy 2d array (float)
+        Source contribution matrix for the normal velocity.
+    B_vortex: Numpy 2d array (float)
+        Vortex contribution matrix for the normal velocity.
+    
+    Returns
+    -------
+    A:  Numpy 2d array (float)
+        Matrix of the linear system.
+    """
+    A = np.empty((A_source.shape[0]+1, A_source.shape[1]+1), dtype=float)
+    # source contribution matrix
+    A[:-1, :-1] = A_source
+    # vortex contribution array
+    A[:-1, -1] = np.sum(B_vortex, axis=1)
+    # Kutta condition array
+    A[-1, :] = kutta_condition(A_source, B_vortex)
+    return A
+
+
+@profiled()
+def source_contribution_normal(panels, method='analytic'):
+    """Builds the source contribution matrix for the normal velocity.
+    
+    Parameters
+    ----------
+    panels: PanelSet or Numpy 1d array (Panel object)
+        List of panels.
+    method: string
+        Panel integration method, 'analytic' or 'quad'.
+    
+    Returns
+    -------
+    A: Numpy 2d array (float)
+        Source contribution matrix.
+    """
+    if method == 'analytic':
+        return influence_matrices(*panel_arrays(panels))[0]
+    A = np.empty((panels.size, panels.size), dtype=float)
+    # source contribution on a panel from itself
+    np.fill_diagonal(A, 0.5)
+    # source contribution on a panel from others
+    for i, panel_i in enumerate(panels):
+        for j, panel_j in enumerate(panels):
+            if i != j:
+                A[i, j] = 0.5/np.pi*integral(panel_i.xc, panel_i.yc, 
+                                                panel_j,
+                                                np.cos(panel_i.beta),
+                                                np.sin(panel_i.beta),
+                                                method=method)
+    return A
+
+
+@profiled()
+def vortex_contribution_normal(panels, method='analytic'):
+    """Builds the vortex contribution matrix for the normal velocity.
+    
+    Parameters
+    ----------
+    panels: PanelSet or Numpy 1d array (Panel object)
+        List of panels.
+    method: string
+        Panel integration method, 'analytic' or 'quad'.
+    
+    Returns
+    -------
+    A: Numpy 2d array (float)
+        Vortex contribution matrix.
+    """
+    if method == 'analytic':
+        # same as the source contribution on the tangential velocity
+        return influence_matrices(*panel_arrays(panels))[1]
+    A = np.empty((panels.size, panels.size), dtype=float)
+    # vortex contribution on a panel from itself
+    np.fill_diagonal(A, 0.0)
+    # vortex contribution on a panel from others
+    for i, panel_i in enumerate(panels):
+        for j, panel_j in enumerate(panels):
+            if i != j:
+                A[i, j] = -0.5/np.pi*integral(panel_i.xc, panel_i.yc, 
+                                                 panel_j,
+                                                 np.sin(panel_i.beta),
+                                                 -np.cos(panel_i.beta),
+                                                 method=method)
+    return A
+
+
+def integral(x, y, panel, dxdz, dydz, method='analytic'):
+    """Evaluates the contribution of a panel at one point.
+    
+    Arguments
+    ---------
+    x, y -- Cartesian coordinates of the point.
+    panel -- panel which contribution is evaluated.
+    dxdz -- derivative of x in the z-direction.
+    dydz -- derivative of y in the z-direction.
+    method -- 'analytic' (closed-form) or 'quad' (scipy quadrature).
+    
+    Returns
+    -------
+    Integral over the panel of the influence at one point.
+    """
+    if method == 'analytic':
+        return float(analytic_integral(x, y, panel.xa, panel.ya, panel.beta,
+                                       panel.length, dxdz, dydz))
+    if method != 'quad':
+        raise ValueError('unknown integration method: {}'.format(method))
+    count('quadratures')
+    def func(s):
+        return ( ((x - (panel.xa - math.sin(panel.beta)*s))*dxdz
+                  +(y - (panel.ya + math.cos(panel.beta)*s))*dydz)
+                / ((x - (panel.xa - math.sin(panel.beta)*s))**2
+                   +(y - (panel.ya + math.cos(panel.beta)*s))**2) )
+    from scipy import integrate
+    return integrate.quad(lambda s:func(s), 0., panel.length)[0]
+
+
+@profiled()
+def get_velocity_field(panels, freestream, X, Y, method='analytic',
+                       chunk_size=None, workers=None):
+    """Returns the velocity field.
+    
+    Arguments
+    ---------
+    panels -- PanelSet or array of panels.
+    freestream -- farfield conditions.
+    X, Y -- mesh grid, or any array of points.
+    method -- panel integration method, 'analytic' or 'quad'.
+    chunk_size -- number of points evaluated at once by the analytic method.
+    workers -- number of threads of the analytic method.
+    """
+    panels = as_panel_set(panels)
+    if method == 'analytic':
+        u, v = panel_velocity(panels, X, Y, chunk_size=chunk_size,
+                              workers=workers)
+        u += freestream.u
+        v += freestream.v
+        return u, v
+    Nx, Ny = X.shape
+    u, v = np.empty((Nx, Ny), dtype=float), np.empty((Nx, Ny), dtype=float)
+    for i in range(Nx):
+        for j in range(Ny):
+            u[i,j] = freestream.u\
+                     + 0.5/np.pi*sum([p.sigma*integral(X[i,j], Y[i,j], p, 1, 0, method) for p in panels])\
+                     + 0.5/np.pi*sum([p.gamma*integral(X[i,j], Y[i,j], p, 0, 1, method) for p in panels])
+
+            v[i,j] = freestream.v\
+                     + 0.5/np.pi*sum([p.sigma*integral(X[i,j], Y[i,j], p, 0, 1, method) for p in panels])\
+                     - 0.5/np.pi*sum([p.gamma*integral(X[i,j], Y[i,j], p, 1, 0, method) for p in panels])
+    return u, v
+
+
+def build_freestream_rhs(panels, freestream):
+    """Builds the right hand-side of the system 
+    arising from the freestream contribution.
+    
+    Parameters
+    ----------
+    panels: PanelSet or Numpy 1d array (Panel object)
+        List of panels.
+    freestream: Freestream object
+        Freestream conditions.
+    
+    Returns
+    -------
+    b: Numpy 1d array (float)
+        Freestream contribution on each panel and on the Kutta condition.
+    """
+    beta = as_panel_set(panels).beta
+    b = np.empty(beta.size+1,dtype=float)
+    # freestream contribution on each panel
+    b[:-1] = -freestream.Vinf * np.cos(freestream.alpha - beta)
+    # freestream contribution on the Kutta condition
+    b[-1] = -freestream.Vinf*( np.sin(freestream.alpha-beta[0])
+                              +np.sin(freestream.alpha-beta[-1]) )
+    return b
+
+
+class PanelSolver:
+    """Source-vortex panel system of one geometry.
+
+    The matrix of the system depends only on the geometry, so it is built
+    and LU-factorized once; each angle of attack only changes the
+    right-hand side, and a whole range of angles is solved in one call.
+    """
+    def __init__(self, panels, matrices=None):
+        """Sets up the system of the panels.
+        
+        Arguments
+        ---------
+        panels -- PanelSet or array of panels.
+        matrices -- arrays returned by assemble(), built if not given.
+        """
+        self.panels = as_panel_set(panels)
+        if matrices is None:
+            matrices = self.assemble(self.panels)
+        self.A_source = matrices['A_source']
+        self.B_vortex = matrices['B_vortex']
+        self.lu = (matrices['lu'], matrices['piv'])
+
+    @staticmethod
+    @profiled()
+    def assemble(panels):
+        """Builds the influence matrices and the LU factors of the system."""
+        # source and vortex contributions on the normal velocity in one pass
+        A_source, B_vortex = influence_matrices(*panel_arrays(panels))
+        from scipy.linalg import lu_factor
+        with stage('lu_factor'):
+            lu, piv = lu_factor(build_singularity_matrix(A_source, B_vortex))
+        return {'A_source': A_source, 'B_vortex': B_vortex,
+                'lu': lu, 'piv': piv}
+
+    @classmethod
+    def for_geometry(cls, panels, cache=None):
+        """Returns the solver of the panels, taking the matrices from the
+        cache (cache.default_cache if not given) when the same geometry
+        was already assembled."""
+        panels = as_panel_set(panels)
+        if cache is None:
+            cache = default_cache
+        matrices = cache.get(panels.geometry_key(),
+                             lambda: cls.assemble(panels))
+        return cls(panels, matrices)
+
+    def freestream_rhs(self, alpha, Vinf=1.0):
+        """Builds the right hand-sides for one or several angles of attack.
+        
+        Parameters
+        ----------
+        alpha: float or Numpy 1d array (float)
+            Angles of attack in degrees.
+        Vinf: float
+            Freestream speed.
+        
+        Returns
+        -------
+        b: Numpy 2d array (float)
+            One right hand-side per column.
+        """
+        alpha = np.radians(np.atleast_1d(np.asarray(alpha, dtype=float)))
+        beta = self.panels.beta
+        b = np.empty((beta.size+1, alpha.size), dtype=float)
+        # freestream contribution on each panel
+        b[:-1] = -Vinf*np.cos(alpha - beta[:, np.newaxis])
+        # freestream contribution on the Kutta condition
+        b[-1] = -Vinf*(np.sin(alpha-beta[0]) + np.sin(alpha-beta[-1]))
+        return b
+
+    @profiled()
+    def solve(self, alpha=0., Vinf=1.0):
+        """Solves the system for one or several angles of attack.
+        
+        Parameters
+        ----------
+        alpha: float or Numpy 1d array (float)
+            Angles of attack in degrees.
+        Vinf: float
+            Freestream speed.
+        
+        Returns
+        -------
+        sigma: Numpy array (float)
+            Source strengths, shape (N_panels,) or (N_alpha, N_panels).
+        gamma: float or Numpy 1d array (float)
+            Vortex strength for each angle.
+        """
+        from scipy.linalg import lu_solve
+        strengths = lu_solve(self.lu, self.freestream_rhs(alpha, Vinf)).T
+        if np.ndim(alpha) == 0:
+            return strengths[0, :-1], strengths[0, -1]
+        return strengths[:, :-1], strengths[:, -1]
+
+    def onset_rhs(self, u, v):
+        """Builds the right hand-side for a non-uniform onset flow.
+        
+        Parameters
+        ----------
+        u, v: Numpy 1d arrays (float)
+            Velocity at the center-points of the panels that is not
+            induced by the panels (freestream, wake...).
+        
+        Returns
+        -------
+        b: Numpy 1d array (float)
+            Right hand-side of the system.
+        """
+        cos_b, sin_b = np.cos(self.panels.beta), np.sin(self.panels.beta)
+        b = np.empty(cos_b.size+1, dtype=float)
+        # onset normal velocity on each panel
+        b[:-1] = -(u*cos_b + v*sin_b)
+        # onset tangential velocity on the Kutta condition
+        vt = -u*sin_b + v*cos_b
+        b[-1] = -(vt[0] + vt[-1])
+        return b
+
+    @profiled()
+    def solve_onset(self, u, v):
+        """Solves the system for a non-uniform onset flow (see onset_rhs).
+        
+        Returns
+        -------
+        sigma: Numpy 1d array (float)
+            Source strengths.
+        gamma: float
+            Vortex strength.
+        """
+        from scipy.linalg import lu_solve
+        strengths = lu_solve(self.lu, self.onset_rhs(u, v))
+        return strengths[:-1], strengths[-1]
+
+    @profiled()
+    def surface_velocity(self, sigma, gamma, alpha=0., Vinf=1.0):
+        """Returns the tangential velocity and pressure coefficient on the
+        panels for the strengths returned by solve().
+        
+        The tangential matrices come from the same pass as the normal ones:
+        the source contribution is the vortex normal matrix and the vortex
+        contribution is the opposite of the source normal matrix.
+        
+        Returns
+        -------
+        vt, cp: Numpy arrays (float)
+            Shape (N_panels,) or (N_alpha, N_panels), as sigma.
+        """
+        alpha = np.radians(np.asarray(alpha, dtype=float))
+        vt = (np.dot(sigma, self.B_vortex.T)
+              - np.multiply.outer(gamma, self.A_source.sum(axis=1))
+              + Vinf*np.sin(alpha[..., np.newaxis] - self.panels.beta))
+        cp = 1.0 - (vt/Vinf)**2
+        return vt, cp
+
+
+@profiled()
+def pressure_coefficients(panels, cp, alpha=0., x_ref=None, y_ref=0.):
+    """Integrates the pressure coefficient into force and moment coefficients.
+    
+    Parameters
+    ----------
+    panels: PanelSet or Numpy 1d array (Panel object)
+        List of panels.
+    cp: Numpy array (float)
+        Pressure coefficient, shape (N_panels,) or (N_alpha, N_panels).
+    alpha: float or Numpy 1d array (float)
+        Angles of attack in degrees, used to get lift and drag.
+    x_ref, y_ref: float
+        Reference point of the moment, the quarter-chord by default.
+    
+    Returns
+    -------
+    cl, cd, cm: float or Numpy 1d arrays (float)
+        Lift, drag and pitching moment (positive nose-up) coefficients,
+        based on the chord.
+    """
+    panels = as_panel_set(panels)
+    chord = panels.xa.max() - panels.xa.min()
+    if x_ref is None:
+        x_ref = panels.xa.min() + 0.25*chord
+    # force on each panel: -cp*length along the outward normal
+    nx = panels.length*np.cos(panels.beta)
+    ny = panels.length*np.sin(panels.beta)
+    cx = -np.dot(cp, nx)/chord
+    cy = -np.dot(cp, ny)/chord
+    cm = np.dot(cp, (panels.xc-x_ref)*ny - (panels.yc-y_ref)*nx)/chord**2
+    alpha = np.radians(alpha)
+    cl = cy*np.cos(alpha) - cx*np.sin(alpha)
+    cd = cx*np.cos(alpha) + cy*np.sin(alpha)
+    return cl, cd, cm
+
+
+def as_geometry(geometry):
+    """Returns the panels of a geometry given as a profile file name,
+    a pair of end-point arrays, a PanelSet or an array of panels."""
+    if isinstance(geometry, str):
+        return PanelSet.from_ends(*read_profile(geometry))
+    if isinstance(geometry, tuple) and len(geometry) == 2:
+        return PanelSet.from_ends(*geometry)
+    return as_panel_set(geometry)
+
+
+@profiled()
+def polar(geometry, alphas, Vinf=1.0):
+    """Computes the polar of a profile over a range of angles of attack.
+    
+    The panel system is built and factorized once and all the angles are
+    solved together; nothing is plotted.
+    
+    Parameters
+    ----------
+    geometry: string, tuple or PanelSet
+        Profile file name, (x_ends, y_ends) or panels.
+    alphas: Numpy 1d array (float)
+        Angles of attack in degrees.
+    Vinf: float
+        Freestream speed.
+    
+    Returns
+    -------
+    result: Numpy structured array
+        One record per angle with fields 'alpha', 'cl' (from circulation),
+        'cl_p', 'cd_p', 'cm_p' (from pressure), 'gamma' (vortex strength)
+        and the per-panel 'sigma', 'vt' and 'cp' arrays.
+    """
+    panels = as_geometry(geometry)
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=float))
+    solver = PanelSolver.for_geometry(panels)
+    sigma, gamma = solver.solve(alphas, Vinf)
+    vt, cp = solver.surface_velocity(sigma, gamma, alphas, Vinf)
+    chord = panels.xa.max() - panels.xa.min()
+    N = panels.size
+    result = np.empty(alphas.size, dtype=[('alpha', float), ('cl', float),
+                                          ('cl_p', float), ('cd_p', float),
+                                          ('cm_p', float), ('gamma', float),
+                                          ('sigma', float, (N,)),
+                                          ('vt', float, (N,)),
+                                          ('cp', float, (N,))])
+    result['alpha'] = alphas
+    result['cl'] = gamma*panels.length.sum()/(0.5*Vinf*chord)
+    result['cl_p'], result['cd_p'], result['cm_p'] = pressure_coefficients(
+        panels, cp, alphas)
+    result['gamma'] = gamma
+    result['sigma'] = sigma
+    result['vt'] = vt
+    result['cp'] = cp
+    return result
+
+
+def integral_normal(p_i, p_j):
+    """Evaluates the contribution of a panel at the center-point of another,
+    in the normal direction.
+    
+    Arguments
+    ---------
+    p_i -- panel on which the contribution is calculated.
+    p_j -- panel from which the contribution is calculated.
+    
+    Returns
+    -------
+    Integral over the panel of the influence at a control-point.
+    """
+    def func(s):
+        return ( (+(p_i.xc-(p_j.xa-math.sin(p_j.beta)*s))*math.cos(p_i.beta)
+                  +(p_i.yc-(p_j.ya+math.cos(p_j.beta)*s))*math.sin(p_i.beta))
+                /((p_i.xc-(p_j.xa-math.sin(p_j.beta)*s))**2
+                  +(p_i.yc-(p_j.ya+math.cos(p_j.beta)*s))**2) )
+    from scipy import integrate
+    return integrate.quad(lambda s:func(s), 0., p_j.length)[0]
+
+
+def integral_tangential(p_i, p_j):
+    """Evaluates the contribution of a panel at the center-point of another,
+    in the tangential direction.
+    
+    Arguments
+    ---------
+    p_i -- panel on which the contribution is calculated.
+    p_j -- panel from which the contribution is calculated.
+    
+    Returns
+    -------
+    Integral over the panel of the influence at a control-point.
+    """
+    def func(s):
+        return ( (-(p_i.xc-(p_j.xa-math.sin(p_j.beta)*s))*math.sin(p_i.beta)
+                  +(p_i.yc-(p_j.ya+math.cos(p_j.beta)*s))*math.cos(p_i.beta))
+                /((p_i.xc-(p_j.xa-math.sin(p_j.beta)*s))**2
+                  +(p_i.yc-(p_j.ya+math.cos(p_j.beta)*s))**2) )
+    from scipy import integrate
+    return integrate.quad(lambda s:func(s),0.,p_j.length)[0]
+
+
+def infiniteSourceSheet(X, Y, y_min, y_max, strength):
+    """Returns the velocity field of a source-sheet on the y-axis.
+    
+    Arguments
+    ---------
+    X, Y -- mesh grid, or any array of points.
+    y_min, y_max -- ends of the sheet on the y-axis.
+    strength -- source strength per unit length.
+    
+    Returns
+    -------
+    u_sheet, v_sheet -- velocity induced by the sheet, to superpose to the
+                        uniform flow.
+    """
+    return sheet_velocity(X, Y, 0., y_min, 0., y_max, sigma=strength)
+
+
+@profiled()
+def flowOverCylinder(R,N_panels):
+    """Solves the source panel method on a cylinder of radius R in a unit
+    freestream and returns its panels with sigma, vt and cp filled."""
+    u_inf=1.0
+# defining the end-points of the panels
+    x_ends = R*np.cos(np.linspace(0, 2*math.pi, N_panels+1))
+    y_ends = R*np.sin(np.linspace(0, 2*math.pi, N_panels+1))
+
+# defining the panels
+    panels = PanelSet.from_ends(x_ends, y_ends)
+   
+    # computes the normal and tangential source influence matrices
+    A, A_tangential = influence_matrices(*panel_arrays(panels))
+
+    # computes the RHS of the linear system
+    b = - u_inf * np.cos(panels.beta)
+
+    # solves the linear system
+    with stage('linalg.solve'):
+        sigma = np.linalg.solve(A, b )#the matrix of the linear system
+    A = A_tangential
+
+    # computes the RHS of the linear system
+    b = - u_inf * np.sin(panels.beta)
+
+    # computes the tangential velocity at each panel center-point
+    vt = np.dot(A, sigma) + b
+
+    panels.vt[:] = vt
+    panels.cp[:] = 1.0 - (vt/u_inf)**2
+    panels.sigma[:] = sigma
+    return panels
@@ -0,0 +1,14 @@
+import pytest
+
+from aeropython import kernels
+
+
+@pytest.fixture(params=kernels.BACKENDS)
+def backend(request):
+    """Runs a test with each backend of the kernels."""
+    if request.param == 'numba' and not kernels.numba_available():
+        pytest.skip('numba is not installed')
+    previous = kernels.get_backend()
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from aeropython import batch
+from aeropython.solver import polar
+
+
+PROFILE = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                       'NACAcamber0012.dat')
+
+
+def test_cache_dir_is_used(tmp_path, monkeypatch):
+    def no_temporary_directory(*args, **kwargs):
+        raise AssertionError('temporary directory created')
+    monkeypatch.setattr(tempfile, 'TemporaryDirectory',
+                        no_temporary_directory)
+    alphas = np.array([0., 4.])
+    table = batch.run_batch([PROFILE], alphas, workers=1,
+                            cache_dir=str(tmp_path))
+    assert os.listdir(str(tmp_path))
+    np.testing.assert_allclose(table['cl'], polar(PROFILE, alphas)['cl'])
+
+
+def test_temporary_directory_by_default():
+    results = list(batch.iter_batch([PROFILE], [2.], workers=1))
+    assert len(results) == 1
+    assert results[0][1]['cl'] == pytest.approx(polar(PROFILE, 2.)['cl'][0])
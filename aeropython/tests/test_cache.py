@@ -0,0 +1,80 @@
+import numpy as np
+
+from aeropython.cache import InfluenceCache
+from aeropython.panels import PanelSet
+from aeropython.solver import PanelSolver
+
+
+class Builder:
+    """Builds entries of 1 kB, counting the calls."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, key):
+        def build():
+            self.calls.append(key)
+            return {'A': np.full(128, float(len(self.calls)))}
+        return build
+
+
+def test_hit():
+    cache, build = InfluenceCache(), Builder()
+    first = cache.get('a', build('a'))
+    assert cache.get('a', build('a')) is first
+    assert build.calls == ['a']
+    assert 'a' in cache and len(cache) == 1
+    assert cache.nbytes == 1024
+
+
+def test_least_recently_used_is_evicted():
+    cache, build = InfluenceCache(max_bytes=2048), Builder()
+    cache.get('a', build('a'))
+    cache.get('b', build('b'))
+    # a hit makes 'a' the most recent entry
+    cache.get('a', build('a'))
+    cache.get('c', build('c'))
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.nbytes == 2048
+    cache.get('b', build('b'))
+    assert build.calls == ['a', 'b', 'c', 'b']
+    assert 'a' not in cache
+
+
+def test_entry_larger_than_the_budget_is_kept():
+    cache, build = InfluenceCache(max_bytes=512), Builder()
+    cache.get('a', build('a'))
+    assert len(cache) == 1
+    cache.get('b', build('b'))
+    assert list(cache._entries) == ['b']
+    assert cache.nbytes == 1024
+
+
+def test_directory(tmp_path):
+    build = Builder()
+    entry = InfluenceCache(directory=str(tmp_path)).get('a', build('a'))
+    # a new cache, as in a new process, reloads the entry
+    cache = InfluenceCache(directory=str(tmp_path))
+    reloaded = cache.get('a', build('a'))
+    assert build.calls == ['a']
+    np.testing.assert_array_equal(reloaded['A'], entry['A'])
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+    assert [p.name for p in tmp_path.iterdir()] == ['a.npz']
+
+
+def test_solver_uses_the_cache():
+    theta = np.linspace(0., 2.*np.pi, 21)
+    cache = InfluenceCache()
+    panels = PanelSet.from_ends(np.cos(theta), 0.2*np.sin(theta))
+    solver = PanelSolver.for_geometry(panels, cache)
+    # the same geometry in a new PanelSet hits the cache
+    same = PanelSet.from_ends(np.cos(theta), 0.2*np.sin(theta))
+    assert PanelSolver.for_geometry(same, cache).lu[0] is solver.lu[0]
+    assert len(cache) == 1
+    other = PanelSet.from_ends(np.cos(theta), 0.3*np.sin(theta))
+    PanelSolver.for_geometry(other, cache)
+    assert len(cache) == 2
+    # the cached matrices solve the system as a fresh assembly
+    np.testing.assert_allclose(solver.solve(4.)[0],
+                               PanelSolver(panels).solve(4.)[0])
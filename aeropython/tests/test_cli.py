@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from aeropython.cli import build_parser, load_config
+
+
+def config(tmp_path, values):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(values))
+    return str(path)
+
+
+def test_values_are_converted(tmp_path):
+    _, commands = build_parser()
+    path = config(tmp_path, {'alpha': '4', 'quiet': True,
+                             'field': {'element': [['vortex', 1, 0, 0]],
+                                       'n': ['5', 5]},
+                             'polar': {'alpha_range': [0, 2, '1']}})
+    assert load_config(path, 'panel', commands) == {'alpha': 4.,
+                                                    'quiet': True}
+    values = load_config(path, 'field', commands)
+    assert values['alpha'] == 4.
+    assert values['element'] == [['vortex', '1', '0', '0']]
+    assert values['n'] == [5, 5]
+    # top-level options must exist for the command
+    with pytest.raises(ValueError):
+        load_config(path, 'polar', commands)
+
+
+@pytest.mark.parametrize('values', [{'alpha_range': [0, 1, 1]},
+                                    {'panels': {'alpha': 1.}},
+                                    {'alpha': 'four'}, {'quiet': 'yes'},
+                                    {'airfoil': ['a.dat', 'b.dat']}])
+def test_invalid_values(tmp_path, values):
+    _, commands = build_parser()
+    with pytest.raises(ValueError):
+        load_config(config(tmp_path, values), 'panel', commands)
+
+
+def test_invalid_field_values(tmp_path):
+    _, commands = build_parser()
+    for values in ({'n': [10, 4.5]}, {'method': 'fast'},
+                   {'element': [['vortex', 1, 0]]}):
+        with pytest.raises(ValueError):
+            load_config(config(tmp_path, values), 'field', commands)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from aeropython.influence import analytic_integral
+from aeropython.panels import PanelSet
+from aeropython.solver import integral
+
+
+def panels():
+    # panels of every orientation
+    angle = np.linspace(0., 2.*np.pi, 7)[:-1]
+    xa, ya = np.cos(angle), 0.5*np.sin(angle)
+    return PanelSet(xa, ya, xa + 0.3*np.cos(2*angle+1.),
+                    ya + 0.3*np.sin(2*angle+1.))
+
+
+def directions(panel):
+    # normal, tangent and an oblique direction of the panel
+    beta = panel.beta
+    return [(np.cos(beta), np.sin(beta)), (-np.sin(beta), np.cos(beta)),
+            (np.cos(0.3), np.sin(0.3))]
+
+
+def test_analytic_matches_quad_off_panel():
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(-2., 2., (2, 20))
+    for panel in panels():
+        for dxdz, dydz in directions(panel):
+            for xi, yi in zip(x, y):
+                expected = integral(xi, yi, panel, dxdz, dydz, method='quad')
+                assert integral(xi, yi, panel, dxdz, dydz) == pytest.approx(
+                    expected, rel=1e-8, abs=1e-10)
+
+
+def test_analytic_is_vectorized():
+    rng = np.random.default_rng(2)
+    x, y = rng.uniform(-2., 2., (2, 5))
+    panel_set = panels()
+    xa, ya = panel_set.xa[:, np.newaxis], panel_set.ya[:, np.newaxis]
+    beta = panel_set.beta[:, np.newaxis]
+    length = panel_set.length[:, np.newaxis]
+    values = analytic_integral(x, y, xa, ya, beta, length, 1., 0.)
+    assert values.shape == (panel_set.size, x.size)
+    for i, panel in enumerate(panel_set):
+        for j in range(x.size):
+            assert values[i, j] == pytest.approx(
+                integral(x[j], y[j], panel, 1., 0., method='quad'), abs=1e-10)
+
+
+@pytest.mark.parametrize('fraction', [0.5, 0.2, 0.9])
+def test_self_panel_limit(fraction):
+    # on the panel the integral is the limit from its normal side
+    eps = 1e-5
+    for panel in panels():
+        x = panel.xa - np.sin(panel.beta)*fraction*panel.length
+        y = panel.ya + np.cos(panel.beta)*fraction*panel.length
+        nx, ny = np.cos(panel.beta), np.sin(panel.beta)
+        for dxdz, dydz in directions(panel):
+            limit = integral(x + eps*nx, y + eps*ny, panel, dxdz, dydz,
+                             method='quad')
+            assert integral(x, y, panel, dxdz, dydz) == pytest.approx(
+                limit, abs=1e-3)
+
+
+def test_self_panel_normal_is_pi():
+    for panel in panels():
+        value = integral(panel.xc, panel.yc, panel, np.cos(panel.beta),
+                         np.sin(panel.beta))
+        assert value == pytest.approx(np.pi)
+
+
+def test_influence_matrices_match_quad(backend):
+    from aeropython.influence import influence_matrices, panel_arrays
+    from aeropython.solver import (source_contribution_normal,
+                                   vortex_contribution_normal)
+    theta = np.linspace(0., 2.*np.pi, 13)
+    panel_set = PanelSet.from_ends(np.cos(theta), 0.3*np.sin(theta))
+    A_normal, A_tangential = influence_matrices(*panel_arrays(panel_set))
+    np.testing.assert_allclose(
+        A_normal, source_contribution_normal(panel_set, method='quad'),
+        atol=1e-10)
+    np.testing.assert_allclose(
+        A_tangential, vortex_contribution_normal(panel_set, method='quad'),
+        atol=1e-10)
+    np.testing.assert_allclose(np.diag(A_normal), 0.5)
+    np.testing.assert_allclose(np.diag(A_tangential), 0.)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from aeropython.multipole import SingularityTree, direct_sum, evaluate
+from aeropython.singularities import doublet, sourceSink, vortex
+
+
+def singularities(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(-1., 1., (2, n))
+    a = rng.standard_normal(n) + 1j*rng.standard_normal(n)
+    b = 0.1*(rng.standard_normal(n) + 1j*rng.standard_normal(n))
+    return x, y, a, b
+
+
+def targets(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-3., 3., (2, n))
+
+
+@pytest.mark.parametrize('theta', [0.3, 0.5, 0.7])
+def test_tree_matches_direct_sum(theta):
+    x, y, a, b = singularities(2000)
+    xt, yt = targets(500)
+    order = 12
+    tree = SingularityTree(x, y, a, b, leaf_size=16, order=order)
+    w, _ = tree.evaluate(xt, yt, theta=theta, stream=False)
+    w_direct, _ = direct_sum(xt + 1j*yt, x + 1j*y, a, b, stream=False)
+    # the error of the expansions is of the order of theta**(order+1)
+    scale = np.abs(w_direct).max()
+    assert np.abs(w - w_direct).max() <= 10*theta**(order+1)*scale
+
+
+def test_tree_potential():
+    # without log terms the potential is single-valued
+    x, y, _, b = singularities(1000)
+    a = np.zeros_like(b)
+    xt, yt = targets(300)
+    tree = SingularityTree(x, y, a, b, leaf_size=16)
+    w, F = tree.evaluate(xt, yt, theta=0.5)
+    w_direct, F_direct = direct_sum(xt + 1j*yt, x + 1j*y, a, b)
+    tolerance = 10*0.5**17
+    assert np.abs(F - F_direct).max() <= tolerance*np.abs(F_direct).max()
+    assert np.abs(w - w_direct).max() <= tolerance*np.abs(w_direct).max()
+
+
+def test_refit_after_moving():
+    x, y, a, b = singularities(1000)
+    xt, yt = targets(200)
+    tree = SingularityTree(x, y, a, b, leaf_size=16)
+    x, y = x + 0.05, 0.9*y
+    tree.refit(x, y)
+    w, _ = tree.evaluate(xt, yt, stream=False)
+    w_direct, _ = direct_sum(xt + 1j*yt, x + 1j*y, a, b, stream=False)
+    np.testing.assert_allclose(w, w_direct, rtol=0.,
+                               atol=1e-6*np.abs(w_direct).max())
+
+
+def test_targets_on_singularities():
+    # a singularity has no influence on itself
+    x, y, a, b = singularities(300)
+    tree = SingularityTree(x, y, a, b, leaf_size=16)
+    w, _ = tree.evaluate(x, y, stream=False)
+    w_direct, _ = direct_sum(x + 1j*y, x + 1j*y, a, b, stream=False)
+    assert np.all(np.isfinite(w))
+    np.testing.assert_allclose(w, w_direct, rtol=0.,
+                               atol=1e-6*np.abs(w_direct).max())
+
+
+def test_direct_sum_backends(backend):
+    x, y, a, b = singularities(200)
+    xt, yt = targets(100)
+    z, zs = xt + 1j*yt, x + 1j*y
+    w, F = direct_sum(z, zs, a, b)
+    dz = z[:, np.newaxis] - zs
+    np.testing.assert_allclose(w, (a/dz - b/dz**2).sum(axis=1), rtol=1e-12)
+    np.testing.assert_allclose(F, (a*np.log(dz) + b/dz).sum(axis=1),
+                               rtol=1e-12)
+
+
+def test_evaluate_elements():
+    elements = [sourceSink(1., -0.5, 0.), vortex(2., 0.5, 0.2),
+                doublet(0.3, 0., -0.4)]
+    X, Y = np.meshgrid(np.linspace(-2., 2., 15), np.linspace(1., 2., 10))
+    u, v, psi = evaluate(elements, X, Y, method='tree', theta=0.2,
+                         leaf_size=1)
+    u_direct, v_direct, psi_direct = evaluate(elements, X, Y, method='direct')
+    assert u.shape == X.shape
+    np.testing.assert_allclose(u, u_direct, atol=1e-9)
+    np.testing.assert_allclose(v, v_direct, atol=1e-9)
+    np.testing.assert_allclose(psi, psi_direct, atol=1e-9)
+    # the velocity of the elements themselves
+    u_ref = sum(e.get_velocity(X, Y)[0] for e in elements)
+    v_ref = sum(e.get_velocity(X, Y)[1] for e in elements)
+    np.testing.assert_allclose(u_direct, u_ref, atol=1e-12)
+    np.testing.assert_allclose(v_direct, v_ref, atol=1e-12)
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+from aeropython.output import FieldReader, FieldWriter
+
+
+def steps(n=4):
+    rng = np.random.default_rng(0)
+    return [{'gamma': rng.standard_normal(5),
+             'u': rng.standard_normal((3, 2)).astype(np.float32)}
+            for _ in range(n)]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_round_trip(tmp_path, compress):
+    path = str(tmp_path / 'store')
+    data = steps()
+    with FieldWriter(path, compress=compress) as writer:
+        for fields in data:
+            writer.append(**fields)
+    with FieldReader(path) as reader:
+        assert len(reader) == len(data)
+        assert sorted(reader.fields) == ['gamma', 'u']
+        for i, fields in enumerate(data):
+            step = reader.step(i)
+            for name, value in fields.items():
+                np.testing.assert_array_equal(step[name], value)
+                assert step[name].dtype == value.dtype
+        if not compress:
+            gamma = reader['gamma']
+            assert isinstance(gamma, np.memmap)
+            np.testing.assert_array_equal(gamma, [f['gamma'] for f in data])
+
+
+def test_read_while_appending(tmp_path):
+    path = str(tmp_path / 'store')
+    data = steps()
+    writer = FieldWriter(path)
+    for i, fields in enumerate(data):
+        writer.append(**fields)
+        # the files are valid after every step
+        with FieldReader(path) as reader:
+            assert len(reader) == i+1
+            np.testing.assert_array_equal(reader['u'][i], fields['u'])
+    writer.close()
+
+
+def test_reopen_replaces_the_store(tmp_path):
+    path = str(tmp_path / 'store')
+    with FieldWriter(path) as writer:
+        for fields in steps():
+            writer.append(**fields)
+    with FieldWriter(path, compress=True) as writer:
+        writer.append(sigma=np.ones(2))
+    assert sorted(os.listdir(path)) == ['fields.json', 'step_0.npz']
+    with FieldReader(path) as reader:
+        assert len(reader) == 1
+        np.testing.assert_array_equal(reader.step(-1)['sigma'], np.ones(2))
+
+
+def test_shape_change(tmp_path):
+    with FieldWriter(str(tmp_path / 'store')) as writer:
+        writer.append(gamma=np.zeros(3))
+        with pytest.raises(ValueError):
+            writer.append(gamma=np.zeros(4))
+
+
+def test_foreign_files_are_kept(tmp_path):
+    foreign = tmp_path / 'data.npy'
+    np.save(str(foreign), np.arange(3))
+    with pytest.raises(FileExistsError):
+        FieldWriter(str(tmp_path))
+    assert foreign.exists()
+    # files added to an older store are not removed either
+    path = str(tmp_path / 'store')
+    FieldWriter(path).close()
+    np.save(os.path.join(path, 'mine.npy'), np.arange(3))
+    with pytest.raises(FileExistsError):
+        FieldWriter(path)
+    assert os.path.exists(os.path.join(path, 'mine.npy'))
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from aeropython.panels import PanelSet, PanelView
+
+
+def circle(n=8):
+    theta = np.linspace(0., 2.*np.pi, n+1)
+    panels = PanelSet.from_ends(np.cos(theta), np.sin(theta))
+    panels.sigma[:] = np.arange(n)
+    return panels
+
+
+def test_integer_index_gives_a_view():
+    panels = circle()
+    view = panels[-1]
+    assert isinstance(view, PanelView)
+    assert view.index == 7
+    view.gamma = 2.
+    assert panels.gamma[7] == 2.
+    with pytest.raises(IndexError):
+        panels[8]
+
+
+@pytest.mark.parametrize('index', [slice(0, 3), np.arange(3),
+                                   np.arange(8) < 3, [0, 1, 2]])
+def test_subset(index):
+    panels = circle()
+    subset = panels[index]
+    assert isinstance(subset, PanelSet)
+    assert len(subset) == 3
+    for name in PanelSet.fields:
+        np.testing.assert_array_equal(getattr(subset, name),
+                                      getattr(panels, name)[:3])
+    # the subset is a copy
+    subset.sigma[:] = -1.
+    assert panels.sigma[0] == 0.
+
+
+def test_bad_index():
+    with pytest.raises(TypeError):
+        circle()[np.array([0.5])]
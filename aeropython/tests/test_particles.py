@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from aeropython.panels import PanelSet
+from aeropython.particles import (BlobTree, ParticleSystem, WakeSolver,
+                                  blob_velocity)
+
+
+def cloud(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(-1., 1., (2, n))
+    return x, y, rng.standard_normal(n)
+
+
+def test_blob_velocity():
+    # Lamb-Oseen vortex: gamma*(1-exp(-r**2/core**2))/(2*pi*r)
+    r = np.array([0.01, 0.1, 1.])
+    u, v = blob_velocity(r, np.zeros(3), np.zeros(1), np.zeros(1),
+                         np.ones(1), 0.1)
+    np.testing.assert_allclose(u, 0.)
+    np.testing.assert_allclose(v, -np.expm1(-(r/0.1)**2)/(2*np.pi*r))
+    # no influence of a particle on itself
+    u, v = blob_velocity(np.zeros(1), np.zeros(1), np.zeros(1), np.zeros(1),
+                         np.ones(1), 0.1)
+    assert u[0] == 0. and v[0] == 0.
+
+
+@pytest.mark.parametrize('core', [0.002, 0.05])
+def test_tree_matches_direct_sum(core):
+    x, y, gamma = cloud(3000)
+    tree = BlobTree(x, y, gamma, core, leaf_size=16, order=12)
+    u, v = tree.velocity(x, y, theta=0.5)
+    u_direct, v_direct = blob_velocity(x, y, x, y, gamma, core)
+    scale = np.hypot(u_direct, v_direct).max()
+    # expansions within theta**(order+1), smoothing within exp(-cutoff**2)
+    tolerance = 10*0.5**13*scale
+    assert np.abs(u - u_direct).max() <= tolerance
+    assert np.abs(v - v_direct).max() <= tolerance
+
+
+def test_update_moves_and_adds_particles():
+    x, y, gamma = cloud(1000)
+    tree = BlobTree(x, y, gamma, 0.01, leaf_size=16)
+    x_new, y_new, gamma_new = cloud(10, seed=1)
+    x = np.concatenate([x + 0.01, x_new])
+    y = np.concatenate([y, y_new])
+    gamma = np.concatenate([gamma, gamma_new])
+    tree.update(x, y, gamma)
+    # the new particles are summed directly until the next rebuild
+    assert tree.gamma_new.size == 10
+    u, v = tree.velocity(x, y)
+    u_direct, v_direct = blob_velocity(x, y, x, y, gamma, 0.01)
+    tolerance = 1e-4*np.hypot(u_direct, v_direct).max()
+    np.testing.assert_allclose(u, u_direct, rtol=0., atol=tolerance)
+    np.testing.assert_allclose(v, v_direct, rtol=0., atol=tolerance)
+    # spreading the cloud rebuilds the tree
+    tree.update(3.*x, 3.*y, gamma)
+    assert tree.gamma_new.size == 0 and tree.gamma.size == 1010
+
+
+def test_system_methods_agree(backend):
+    x, y, gamma = cloud(500)
+    points = np.linspace(-1.5, 1.5, 40)
+    direct = ParticleSystem(x, y, gamma, core=0.05)
+    tree = ParticleSystem(x, y, gamma, core=0.05, method='tree', theta=0.3)
+    u, v = direct.velocity(points, 0.2)
+    u_tree, v_tree = tree.velocity(points, 0.2)
+    u_ref, v_ref = blob_velocity(points, np.full(40, 0.2), x, y, gamma, 0.05)
+    np.testing.assert_allclose(u, u_ref, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(v, v_ref, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(u_tree, u_ref, rtol=0., atol=1e-6)
+    np.testing.assert_allclose(v_tree, v_ref, rtol=0., atol=1e-6)
+
+
+def naca0012(n=30):
+    x = 0.5*(1. - np.cos(np.linspace(0., np.pi, n+1)))
+    t = 0.6*(0.2969*np.sqrt(x) - 0.1260*x - 0.3516*x**2 + 0.2843*x**3
+             - 0.1036*x**4)
+    t -= x*t[-1]
+    return PanelSet.from_ends(np.concatenate([x[::-1], x[1:]]),
+                              np.concatenate([t[::-1], -t[1:]]))
+
+
+@pytest.mark.parametrize('scheme', ['euler', 'rk2'])
+def test_wake_conserves_circulation(scheme):
+    wake = WakeSolver(naca0012(), alpha=5., dt=0.05, scheme=scheme)
+    for step in range(1, 16):
+        wake.step()
+        # one particle shed per step
+        assert len(wake.wake) == step
+        # Kelvin: bound plus shed circulation stays zero, as at rest
+        total = wake.circulation[-1] + wake.wake.gamma.sum()
+        assert total == pytest.approx(0., abs=1e-12)
+    bound = np.array(wake.circulation)
+    # lifting body: clockwise (negative) bound circulation, growing from
+    # the impulsive start towards the steady value (Wagner)
+    steady = -wake.solver.solve(5.)[1]*wake.panels.length.sum()
+    assert np.all(bound < 0.)
+    assert np.all(np.diff(np.abs(bound)) > 0.)
+    assert 0.5*abs(steady) < abs(bound[-1]) < abs(steady)
@@ -0,0 +1,64 @@
+import threading
+
+import numpy as np
+import pytest
+
+from aeropython.output import FieldReader, FieldWriter
+from aeropython.pipeline import FramePipeline
+
+
+X = np.zeros((2, 2))
+LIMITS = (X[0], X[0], (0., 1.), (0., 1.))
+
+
+class BlockedWriter:
+    """Writer whose appends wait for an event."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.steps = []
+
+    def append(self, **fields):
+        self.release.wait()
+        self.steps.append(fields)
+
+
+def test_fields_are_appended_in_order(tmp_path):
+    path = str(tmp_path / 'fields')
+    with FieldWriter(path) as writer:
+        with FramePipeline(False, max_pending=2, writer=writer) as pipeline:
+            for it in range(20):
+                pipeline.submit(it, X, X, X + it, X - it, *LIMITS,
+                                t=float(it))
+    with FieldReader(path) as reader:
+        assert len(reader) == 20
+        np.testing.assert_array_equal(reader['t'], np.arange(20.))
+        np.testing.assert_array_equal(reader['u'][:, 0, 0], np.arange(20.))
+
+
+def test_submit_blocks_when_the_queue_is_full():
+    writer = BlockedWriter()
+    pipeline = FramePipeline(False, max_pending=2, writer=writer)
+    pipeline.submit(0, X, X, X, X, *LIMITS)
+    pipeline.submit(1, X, X, X, X, *LIMITS)
+    third = threading.Thread(target=pipeline.submit,
+                             args=(2, X, X, X, X) + LIMITS)
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+    writer.release.set()
+    third.join(5.)
+    assert not third.is_alive()
+    pipeline.close()
+    assert len(writer.steps) == 3
+
+
+def test_failed_submit_releases_its_slot():
+    writer = BlockedWriter()
+    writer.release.set()
+    pipeline = FramePipeline(False, max_pending=1, writer=writer)
+    pipeline._store.shutdown()
+    for it in range(3):
+        # would block on the second call if the slot were kept
+        with pytest.raises(RuntimeError):
+            pipeline.submit(it, X, X, X, X, *LIMITS)
+    pipeline.close()
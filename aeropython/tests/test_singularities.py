@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from aeropython.singularities import (doublet, freeStream, sourceSink,
+                                      superpose, vortex)
+
+
+def elements():
+    return [sourceSink(1.5, -0.5, 0.1), doublet(0.8, 0.3, -0.2),
+            vortex(-2., 0.1, 0.6), sourceSink(-1., 0.7, 0.4),
+            doublet(-0.3, -0.6, -0.5), vortex(0.5, -0.2, -0.7)]
+
+
+def grid():
+    # no point on a singularity
+    return np.meshgrid(np.linspace(-2., 2., 41) + 0.013,
+                       np.linspace(-1.5, 1.5, 31) + 0.007)
+
+
+@pytest.mark.parametrize('tile_size', [2**14, 100])
+def test_superpose_is_the_sum_of_the_elements(tile_size):
+    X, Y = grid()
+    u, v, psi, phi = superpose(elements(), X, Y, potential=True,
+                               tile_size=tile_size)
+    fields = [sum(f) for f in zip(*[e.evaluate(X, Y, potential=True)
+                                    for e in elements()])]
+    for field, expected in zip((u, v, psi, phi), fields):
+        assert field.shape == X.shape
+        np.testing.assert_allclose(field, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_accumulate_matches_the_closed_forms():
+    X, Y = grid()
+    for e in elements():
+        u, v, psi = e.evaluate(X, Y)
+        u_ref, v_ref = e.get_velocity(X, Y)
+        np.testing.assert_allclose(u, u_ref, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(v, v_ref, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(psi, e.get_stream_function(X, Y),
+                                   rtol=1e-12, atol=1e-12)
+
+
+def test_superpose_with_freestream():
+    X, Y = grid()
+    Vinf = freeStream(1.2, 5.)
+    u, v, psi = superpose(elements(), X, Y, freestream=Vinf)
+    u_ref = sum(e.get_velocity(X, Y)[0] for e in elements()) + Vinf.u
+    v_ref = sum(e.get_velocity(X, Y)[1] for e in elements()) + Vinf.v
+    psi_ref = (sum(e.get_stream_function(X, Y) for e in elements())
+               + Vinf.u*Y - Vinf.v*X)
+    np.testing.assert_allclose(u, u_ref, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(v, v_ref, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(psi, psi_ref, rtol=1e-12, atol=1e-12)
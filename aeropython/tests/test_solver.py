@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from aeropython.panels import PanelSet
+from aeropython.solver import PanelSolver, polar, pressure_coefficients
+
+
+ALPHAS = [0., 2., 4., 8.]
+
+
+def naca0012(n=80):
+    """Panels of a NACA 0012 with n points by side (cosine spacing), in the
+    order of the Selig files."""
+    x = 0.5*(1. - np.cos(np.linspace(0., np.pi, n+1)))
+    t = 0.6*(0.2969*np.sqrt(x) - 0.1260*x - 0.3516*x**2 + 0.2843*x**3
+             - 0.1036*x**4)
+    # thickness closed at the trailing edge
+    t -= x*t[-1]
+    return PanelSet.from_ends(np.concatenate([x[::-1], x[1:]]),
+                              np.concatenate([t[::-1], -t[1:]]))
+
+
+def test_pressure_lift_matches_circulation_lift():
+    panels = naca0012()
+    result = polar(panels, ALPHAS)
+    # within 1 % of the circulation lift (0.01 at zero lift)
+    np.testing.assert_allclose(result['cl_p'], result['cl'], rtol=1e-2,
+                               atol=1e-2)
+    # thin airfoil theory, 2*pi*alpha, a few % more for the thickness
+    np.testing.assert_allclose(result['cl'], 2*np.pi*np.radians(ALPHAS),
+                               rtol=0.15, atol=1e-10)
+    # symmetric profile: no lift and no moment at zero incidence
+    assert abs(result['cl'][0]) < 1e-10
+    assert abs(result['cm_p'][0]) < 1e-10
+
+
+@pytest.mark.parametrize('alpha', ALPHAS)
+def test_pressure_coefficients_of_a_solution(alpha):
+    panels = naca0012()
+    solver = PanelSolver(panels)
+    sigma, gamma = solver.solve(alpha)
+    _, cp = solver.surface_velocity(sigma, gamma, alpha)
+    cl, cd, _ = pressure_coefficients(panels, cp, alpha)
+    cl_gamma = 2.*gamma*panels.length.sum()
+    assert cl == pytest.approx(cl_gamma, rel=1e-2, abs=1e-10)
+    # no drag in inviscid flow (d'Alembert), up to the discretization
+    assert abs(cd) < 1e-3
+
+
+def test_drag_vanishes_with_refinement():
+    cd = [polar(naca0012(n), 4.)['cd_p'][0] for n in (40, 80, 160)]
+    assert cd[0] > cd[1] > cd[2] > 0.
+    assert cd[2] < 2e-4
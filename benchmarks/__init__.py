@@ -0,0 +1,12 @@
+"""Benchmarks of the panel solver, the field evaluation and the
+superposition of singularities.
+
+Run from the root of the repository:
+
+    python -m benchmarks [--quick] [patterns...]
+
+Each run is appended to benchmarks/history.json (one record per run with
+the commit, the machine and the median times), and compared with the
+previous one, so that regressions show up in the output and as diffs of
+the history.
+"""
@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+
+from . import harness, suites
+
+
+HISTORY = os.path.join(os.path.dirname(__file__), 'history.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Times the panel solver, the field evaluation and the '
+                    'superposition of singularities.')
+    parser.add_argument('patterns', nargs='*',
+                        help="benchmarks to run, as shell patterns on "
+                             "'name(param)' (e.g. 'assemble.*', "
+                             "'*(2000)'); all by default")
+    parser.add_argument('--quick', action='store_true',
+                        help='small sizes only')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='samples per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum duration of a sample in seconds')
+    parser.add_argument('--history', default=HISTORY,
+                        help='JSON history file (default: %(default)s)')
+    parser.add_argument('--no-save', action='store_true',
+                        help='do not append the run to the history')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='time ratio flagged against the previous run')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    selected = list(harness.select(args.patterns, args.quick))
+    if args.list:
+        for name, _, _ in selected:
+            print(name)
+        return 0
+    if not selected:
+        parser.error('no benchmark matches {}'.format(args.patterns))
+
+    results = {}
+    for name, setup, param in selected:
+        stats = harness.measure(setup(param), args.repeat, args.min_time)
+        results[name] = stats
+        print('{:<32s} {:12.6f} s  (+- {:.6f}, {} x {})'.format(
+            name, stats['median'], stats['stdev'], stats['repeat'],
+            stats['number']))
+        sys.stdout.flush()
+
+    runs = harness.load_history(args.history)
+    if runs:
+        rows = harness.compare(runs[-1]['results'], results, args.threshold)
+        if rows:
+            print('\ncompared with {} ({}):'.format(runs[-1]['commit'],
+                                                   runs[-1]['date']))
+        for name, before, after, ratio, flag in rows:
+            print('{:<32s} {:12.6f} -> {:12.6f} s  x{:5.2f} {}'.format(
+                name, before, after, ratio, flag))
+    if not args.no_save:
+        runs.append(harness.new_run(results))
+        harness.save_history(args.history, runs)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
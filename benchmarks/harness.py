@@ -0,0 +1,143 @@
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import timeit
+
+import numpy as np
+
+
+# registered benchmarks: name -> (setup function, parameters, quick parameters)
+BENCHMARKS = {}
+
+
+def benchmark(name, params, quick=None):
+    """Registers a benchmark.
+
+    The decorated function takes one parameter value and returns the
+    function to time, so that the setup (geometry, matrices, grids) is not
+    timed.
+
+    Arguments
+    ---------
+    name -- name of the benchmark; the parameter is appended to it.
+    params -- parameter values (panel counts, grid sizes...).
+    quick -- subset of the parameters of a quick run, all by default.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, list(params),
+                            list(params if quick is None else quick))
+        return setup
+    return register
+
+
+def select(patterns=None, quick=False):
+    """Yields the (name, setup, parameter) of the selected benchmarks.
+
+    Arguments
+    ---------
+    patterns -- shell-style patterns matched against 'name(param)', all
+                the benchmarks by default.
+    quick -- only the parameters of a quick run.
+    """
+    for name, (setup, params, quick_params) in BENCHMARKS.items():
+        for param in (quick_params if quick else params):
+            key = '{}({})'.format(name, param)
+            if not patterns or any(fnmatch.fnmatch(key, pattern)
+                                   for pattern in patterns):
+                yield key, setup, param
+
+
+def measure(function, repeat=5, min_time=0.2):
+    """Times a function, in the manner of timeit and pytest-benchmark.
+
+    The function is called once to warm up (JIT compilation, caches), then
+    the number of calls per sample is chosen so that a sample lasts about
+    min_time, and repeat samples are taken.
+
+    Returns
+    -------
+    stats -- dict of the min, median, mean and stdev of the time of one
+             call, in seconds, with the number of calls per sample and the
+             number of samples.
+    """
+    function()
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(2*number, int(1.2*number*min_time/max(elapsed, 1e-9)))
+    samples = [elapsed/number]
+    samples += [t/number for t in timer.repeat(repeat-1, number)]
+    return {'min': min(samples), 'median': statistics.median(samples),
+            'mean': statistics.mean(samples),
+            'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.,
+            'number': number, 'repeat': len(samples)}
+
+
+def machine():
+    """Returns the description of the machine and of the environment."""
+    from aeropython.kernels import get_backend
+    from aeropython.parallel import num_threads
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'processor': platform.machine(),
+            'cpu_count': os.cpu_count(), 'threads': num_threads(),
+            'backend': get_backend()}
+
+
+def commit():
+    """Returns the current git commit, or None outside a repository."""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def load_history(path):
+    """Returns the runs recorded in a history file (empty if missing)."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, runs):
+    """Writes the runs, one key per line and sorted, so that successive
+    runs show up as diffs."""
+    with open(path, 'w') as f:
+        json.dump(runs, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def new_run(results):
+    """Returns the history entry of a run."""
+    return {'date': datetime.datetime.now(datetime.timezone.utc)
+                    .isoformat(timespec='seconds'),
+            'commit': commit(), 'machine': machine(), 'results': results}
+
+
+def compare(previous, results, threshold=1.2):
+    """Compares the median times of a run with a previous one.
+
+    Returns
+    -------
+    rows -- list of (name, previous median, median, ratio, flag), flag
+            being 'slower' or 'faster' when the ratio passes the threshold.
+    """
+    rows = []
+    for name, stats in results.items():
+        if name not in previous:
+            continue
+        before, after = previous[name]['median'], stats['median']
+        ratio = after/before
+        flag = ('slower' if ratio > threshold
+                else 'faster' if ratio < 1./threshold else '')
+        rows.append((name, before, after, ratio, flag))
+    return rows
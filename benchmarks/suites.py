@@ -0,0 +1,173 @@
+import os
+
+import numpy as np
+
+from aeropython import kernels
+from aeropython.airfoil import close_trailing_edge, load_airfoil
+from aeropython.multipole import (SingularityTree, evaluate,
+                                  singularity_coefficients)
+from aeropython.panels import PanelSet
+from aeropython.singularities import freeStream, superpose, vortex
+from aeropython.solver import (PanelSolver, get_velocity_field,
+                               source_contribution_normal)
+
+from .harness import benchmark
+
+
+NACA = os.path.join(os.path.dirname(__file__), os.pardir, 'NACAcamber0012.dat')
+
+PANELS = [20, 50, 100, 200, 500, 1000, 2000]
+PANELS_QUICK = [20, 100, 500]
+GRIDS = [50, 100, 200, 500, 1000, 2000]
+GRIDS_QUICK = [50, 100, 200]
+ELEMENTS = [10, 100, 1000, 10000]
+ELEMENTS_QUICK = [10, 100, 1000]
+
+ALPHA = 4.
+
+
+def cylinder_panels(n, R=1.0):
+    """Panels of a cylinder of radius R."""
+    theta = np.linspace(0., 2*np.pi, n+1)
+    return PanelSet.from_ends(R*np.cos(theta), R*np.sin(theta))
+
+
+def naca_panels(n):
+    """Panels of NACAcamber0012.dat, resampled to n panels with a cosine
+    spacing along each surface (clustered at the edges)."""
+    x, y = close_trailing_edge(*load_airfoil(NACA))
+    le = np.argmin(x)
+    x_ends, y_ends = [], []
+    for xs, ys, m in ((x[:le+1], y[:le+1], n//2),
+                      (x[le:], y[le:], n - n//2)):
+        s = np.concatenate(([0.], np.cumsum(np.hypot(np.diff(xs),
+                                                     np.diff(ys)))))
+        t = 0.5*s[-1]*(1. - np.cos(np.linspace(0., np.pi, m+1)))
+        # the leading edge is shared by the two surfaces
+        start = 1 if x_ends else 0
+        x_ends.append(np.interp(t, s, xs)[start:])
+        y_ends.append(np.interp(t, s, ys)[start:])
+    return PanelSet.from_ends(np.concatenate(x_ends), np.concatenate(y_ends))
+
+
+GEOMETRIES = {'cylinder': cylinder_panels, 'naca': naca_panels}
+
+
+def grid(n, extent=2.):
+    """Square mesh grid of n*n points."""
+    x = np.linspace(-extent, extent, n)
+    return np.meshgrid(x, x)
+
+
+def solved(panels):
+    """Returns the solver of the panels and stores the strengths at ALPHA."""
+    solver = PanelSolver(panels)
+    sigma, gamma = solver.solve(ALPHA)
+    panels.sigma[:] = sigma
+    panels.gamma[:] = gamma
+    return solver, sigma, gamma
+
+
+def random_vortices(n, seed=0):
+    """n vortices of random strengths inside the unit square."""
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(-1., 1., (2, n))
+    gamma = rng.normal(size=n)
+    return [vortex(g, xi, yi) for g, xi, yi in zip(gamma, x, y)]
+
+
+# panel solver: assembly and LU factorization, solve, post-processing
+
+for _name, _panels in GEOMETRIES.items():
+
+    @benchmark('assemble.' + _name, PANELS, PANELS_QUICK)
+    def assemble(n, _panels=_panels):
+        panels = _panels(n)
+        return lambda: PanelSolver.assemble(panels)
+
+    @benchmark('solve.' + _name, PANELS, PANELS_QUICK)
+    def solve(n, _panels=_panels):
+        solver = PanelSolver(_panels(n))
+        return lambda: solver.solve(ALPHA)
+
+    @benchmark('surface.' + _name, PANELS, PANELS_QUICK)
+    def surface(n, _panels=_panels):
+        solver, sigma, gamma = solved(_panels(n))
+        return lambda: solver.surface_velocity(sigma, gamma, ALPHA)
+
+
+@benchmark('solve_polar.naca', PANELS, PANELS_QUICK)
+def solve_polar(n):
+    solver = PanelSolver(naca_panels(n))
+    alphas = np.arange(-10., 10.5, 0.5)
+    return lambda: solver.solve(alphas)
+
+
+@benchmark('matrix_quad.cylinder', [20, 50, 100], [20])
+def matrix_quad(n):
+    # the scipy quadrature of integral(), for comparison with assemble
+    panels = cylinder_panels(n)
+    return lambda: source_contribution_normal(panels, method='quad')
+
+
+# off-body field of the panels
+
+@benchmark('field_grid.naca200', GRIDS, GRIDS_QUICK)
+def field_grid(n):
+    panels = naca_panels(200)
+    solved(panels)
+    X, Y = grid(n)
+    freestream = freeStream(1.0, ALPHA)
+    return lambda: get_velocity_field(panels, freestream, X, Y)
+
+
+@benchmark('field_panels.grid100', PANELS, PANELS_QUICK)
+def field_panels(n):
+    panels = naca_panels(n)
+    solved(panels)
+    X, Y = grid(100)
+    freestream = freeStream(1.0, ALPHA)
+    return lambda: get_velocity_field(panels, freestream, X, Y)
+
+
+# superposition of point singularities on a 200*200 grid
+
+@benchmark('superpose.vortex', ELEMENTS, ELEMENTS_QUICK)
+def superpose_vortex(n):
+    elements = random_vortices(n)
+    X, Y = grid(200)
+    return lambda: superpose(elements, X, Y)
+
+
+@benchmark('tree.vortex', ELEMENTS, ELEMENTS_QUICK)
+def tree_vortex(n):
+    elements = random_vortices(n)
+    X, Y = grid(200)
+    return lambda: evaluate(elements, X, Y)
+
+
+def with_backend(name, function):
+    """Returns function run with a backend of the kernels, the previous
+    one being restored after each call."""
+    def run():
+        previous = kernels.get_backend()
+        kernels.set_backend(name)
+        try:
+            return function()
+        finally:
+            kernels.set_backend(previous)
+    return run
+
+
+# leaves of the tree-code with each backend, on a 300*300 grid
+
+for _backend in kernels.BACKENDS:
+    if _backend == 'numba' and not kernels.numba_available():
+        continue
+
+    @benchmark('tree_backend.' + _backend, [1000, 3000, 10000], [3000])
+    def tree_backend(n, _backend=_backend):
+        tree = SingularityTree(*singularity_coefficients(random_vortices(n)))
+        X, Y = grid(300)
+        x, y = X.ravel(), Y.ravel()
+        return with_backend(_backend, lambda: tree.evaluate(x, y))